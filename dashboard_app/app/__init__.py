@@ -55,4 +55,15 @@ def create_app(config_name='default'):
     app.jinja_env.filters['format_currency'] = helpers.format_currency
     app.jinja_env.filters['format_number'] = helpers.format_number
     
+    # Warm the dataset before workers fork so they all share it (after the
+    # blueprints are imported, so the services' materialized aggregates are
+    # registered and built here too)
+    if app.config.get('PRELOAD_DATA'):
+        from app.services.data_loader import DataLoader
+        with app.app_context():
+            DataLoader.load_products()
+            DataLoader.load_suppliers()
+            # Don't hand pooled database connections to forked workers
+            db.engine.dispose()
+    
     return app
\ No newline at end of file
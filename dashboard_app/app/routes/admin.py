@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from functools import wraps
 from app.services.data_loader import DataLoader
 from app.services.aggregations import Aggregations
+from app.services.filters import Filters
 from models import db, Article
 from datetime import datetime
 import os
@@ -34,24 +35,41 @@ def admin_dashboard():
     
     # Get data freshness
     cache_time = DataLoader._cache_timestamp
+    memory_report = DataLoader.get_memory_report()
     
     return render_template('admin/admin_dashboard.html',
                          stats=stats,
                          cache_time=cache_time,
+                         memory_report=memory_report,
                          active_page='admin')
 
+@bp.route('/memory-report')
+@login_required
+@admin_required
+def memory_report():
+    """Bytes per column before and after dtype compaction"""
+    return jsonify(DataLoader.get_memory_report())
+
+@bp.route('/filter-cache')
+@login_required
+@admin_required
+def filter_cache():
+    """Hit/miss counters of the filter result cache"""
+    return jsonify(Filters.get_cache_stats())
+
 @bp.route('/refresh-data', methods=['POST'])
 @login_required
 @admin_required
 def refresh_data():
     """Refresh cached data"""
     try:
-        DataLoader.clear_cache()
-        DataLoader.load_products(force_reload=True)
-        DataLoader.load_suppliers(force_reload=True)
+        reloaded = DataLoader.refresh()
+        count = sum(len(result['reloaded']) for result in reloaded.values())
         return jsonify({
             'success': True,
-            'message': 'Data refreshed successfully'
+            'message': f'Data refreshed successfully ({count} file(s) reloaded)',
+            'reloaded': reloaded,
+            'report': DataLoader.get_load_report()
         })
     except Exception as e:
         return jsonify({
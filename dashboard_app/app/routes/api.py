@@ -1,14 +1,71 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
 import pandas as pd
 from app.services.data_loader import DataLoader
 from app.services.aggregations import Aggregations
 from app.services.filters import Filters
 from app.services.comparisons import Comparisons
+from app.services.facets import Facets
+from app.services.histograms import Histograms
+from app.services.indexes import rank_rows
+from app.services.pagination import Pagination
+from app.utils.constants import FIELD_PRESETS, MAX_HISTOGRAM_BINS
+from app.utils.helpers import resolve_fields
 from models import db, Wishlist
 
 bp = Blueprint('api', __name__)
 
+
+def _page_args():
+    """Paging parameters shared by the list endpoints"""
+    return {
+        'sort': request.args.get('sort'),
+        'page': request.args.get('page', 1, type=int),
+        'per_page': request.args.get('per_page', current_app.config.get('ITEMS_PER_PAGE'), type=int),
+        'cursor': request.args.get('cursor')
+    }
+
+
+def _fields(preset_group, columns):
+    """Columns requested with fields= ('card', 'table' or a comma-separated list), or None for all"""
+    return resolve_fields(request.args.get('fields'), columns, FIELD_PRESETS[preset_group])
+
+
+def _product_filters():
+    """Product filter parameters of the request"""
+    return {
+        'price_min': request.args.get('price_min', type=float),
+        'price_max': request.args.get('price_max', type=float),
+        'rating_min': request.args.get('rating_min', type=float),
+        'category': request.args.get('category'),
+        'search_term': request.args.get('search'),
+        'match': request.args.get('match', 'exact')
+    }
+
+
+def _supplier_filters():
+    """Supplier filter parameters of the request"""
+    return {
+        'price_min': request.args.get('price_min', type=float),
+        'price_max': request.args.get('price_max', type=float),
+        'rating_min': request.args.get('rating_min', type=float),
+        'location': request.args.get('location'),
+        'category': request.args.get('category'),
+        'search_term': request.args.get('search'),
+        'match': request.args.get('match', 'exact')
+    }
+
+
+def _product_rows():
+    """Row ids of the products matching the request's filter parameters (None when unfiltered)"""
+    return Filters.filter_product_rows(**_product_filters())
+
+
+def _supplier_rows():
+    """Row ids of the suppliers matching the request's filter parameters (None when unfiltered)"""
+    return Filters.filter_supplier_rows(**_supplier_filters())
+
+
 @bp.route('/stats')
 def get_stats():
     """Get overview statistics"""
@@ -18,47 +75,42 @@ def get_stats():
 @bp.route('/products')
 def get_products():
     """Get filtered products"""
-    price_min = request.args.get('price_min', type=float)
-    price_max = request.args.get('price_max', type=float)
-    rating_min = request.args.get('rating_min', type=float)
-    category = request.args.get('category')
-    search = request.args.get('search')
+    rows = _product_rows()
     
-    filtered = Filters.filter_products(
-        price_min=price_min,
-        price_max=price_max,
-        rating_min=rating_min,
-        category=category,
-        search_term=search
-    )
+    # Only the requested page and fields are materialized and serialized
+    products = DataLoader.load_products(copy=False)
+    try:
+        columns = _fields('products', products.columns)
+        page_rows, pagination = Pagination.paginate('products', rows, len(products), **_page_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
+    if columns is not None:
+        products = products[columns]
     return jsonify({
-        'products': filtered.to_dict('records'),
-        'count': len(filtered)
+        'products': products.take(page_rows).to_dict('records'),
+        'count': pagination['total_items'],
+        'pagination': pagination
     })
 
 @bp.route('/suppliers')
 def get_suppliers():
     """Get filtered suppliers"""
-    price_min = request.args.get('price_min', type=float)
-    price_max = request.args.get('price_max', type=float)
-    rating_min = request.args.get('rating_min', type=float)
-    location = request.args.get('location')
-    category = request.args.get('category')
-    search = request.args.get('search')
+    rows = _supplier_rows()
     
-    filtered = Filters.filter_suppliers(
-        price_min=price_min,
-        price_max=price_max,
-        rating_min=rating_min,
-        location=location,
-        category=category,
-        search_term=search
-    )
+    suppliers = DataLoader.load_suppliers(copy=False)
+    try:
+        columns = _fields('suppliers', suppliers.columns)
+        page_rows, pagination = Pagination.paginate('suppliers', rows, len(suppliers), **_page_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
+    if columns is not None:
+        suppliers = suppliers[columns]
     return jsonify({
-        'suppliers': filtered.to_dict('records'),
-        'count': len(filtered)
+        'suppliers': suppliers.take(page_rows).to_dict('records'),
+        'count': pagination['total_items'],
+        'pagination': pagination
     })
 
 @bp.route('/top-products')
@@ -67,7 +119,12 @@ def get_top_products():
     sort_by = request.args.get('sort_by', 'ratings')
     limit = request.args.get('limit', 5, type=int)
     
-    top = Aggregations.get_top_products(limit=limit, sort_by=sort_by)
+    try:
+        columns = _fields('products', DataLoader.load_products(copy=False).columns)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    top = Aggregations.get_top_products(limit=limit, sort_by=sort_by, fields=columns)
     return jsonify(top)
 
 @bp.route('/top-suppliers')
@@ -87,9 +144,12 @@ def get_categories():
 
 @bp.route('/price-distribution')
 def get_price_distribution():
-    """Get price distribution for charts"""
+    """Get price distribution for charts (takes the /products filters)"""
     bins = request.args.get('bins', 10, type=int)
-    distribution = Aggregations.get_price_distribution(bins=bins)
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        return jsonify({'error': f'bins must be between 1 and {MAX_HISTOGRAM_BINS}'}), 400
+    
+    distribution = Aggregations.get_price_distribution(bins=bins, rows=_product_rows())
     return jsonify(distribution)
 
 @bp.route('/rating-distribution')
@@ -98,6 +158,23 @@ def get_rating_distribution():
     distribution = Aggregations.get_rating_distribution()
     return jsonify(distribution)
 
+@bp.route('/percentiles')
+def get_percentiles():
+    """Price or rating percentiles per product category or supplier location"""
+    dataset = request.args.get('dataset', 'products')
+    column = request.args.get('column', 'price')
+    if dataset not in ('products', 'suppliers') or column not in ('price', 'rating'):
+        return jsonify({'error': 'dataset must be products or suppliers and column price or rating'}), 400
+    
+    try:
+        quantiles = [float(q) for q in request.args.get('q', '0.5,0.9,0.99').split(',')]
+    except ValueError:
+        return jsonify({'error': 'q must be a comma-separated list of numbers'}), 400
+    if not all(0 <= q <= 1 for q in quantiles):
+        return jsonify({'error': 'quantiles must be between 0 and 1'}), 400
+    
+    return jsonify(Aggregations.get_percentiles(dataset, column, quantiles))
+
 @bp.route('/location-stats')
 def get_location_stats():
     """Get supplier location statistics"""
@@ -128,9 +205,38 @@ def product_vs_suppliers(product_id):
 
 @bp.route('/filter-options')
 def get_filter_options():
-    """Get all available filter options"""
-    options = Filters.get_filter_options()
-    return jsonify(options)
+    """Get all available filter options (304 when the client's ETag is current)"""
+    body, etag = Filters.get_filter_options_json()
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@bp.route('/product-identifiers')
+def get_product_identifiers():
+    """Product identifiers for pickers, paged and optionally narrowed to a typed prefix"""
+    identifiers, pagination = Filters.get_product_identifiers(
+        query=request.args.get('q'),
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', type=int)
+    )
+    return jsonify({'products': identifiers, 'pagination': pagination})
+
+@bp.route('/facets/products')
+def get_product_facets():
+    """Result counts per category, price range and rating band under the current filters
+    
+    Each facet is counted under every filter except its own, so the other
+    values of a facet that is already filtered on still show their counts.
+    """
+    return jsonify(Facets.counts('products', Filters.product_predicates(**_product_filters())))
+
+@bp.route('/facets/suppliers')
+def get_supplier_facets():
+    """Result counts per category, location, price range and rating band under the current filters
+    
+    Each facet is counted under every filter except its own (see get_product_facets).
+    """
+    return jsonify(Facets.counts('suppliers', Filters.supplier_predicates(**_supplier_filters())))
 
 @bp.route('/charts/products')
 def get_product_charts():
@@ -140,29 +246,28 @@ def get_product_charts():
     rating_min = request.args.get('rating_min', type=float)
     category = request.args.get('category')
     
-    filtered = Filters.filter_products(
+    rows = Filters.filter_product_rows(
         price_min=price_min,
         price_max=price_max,
         rating_min=rating_min,
-        category=category
+        category=category,
+        match=request.args.get('match', 'exact')
     )
+    products = DataLoader.load_products(copy=False)
     
-    # Replace NaN values with 0
-    filtered = filtered.fillna(0)
-    
-    # Rating distribution
+    # Rating distribution (missing ratings count as 0)
     rating_bins = [0, 1, 2, 3, 4, 5]
     rating_labels = ['0-1★', '1-2★', '2-3★', '3-4★', '4-5★']
-    filtered['Rating_Bin'] = pd.cut(filtered['Ratings'], bins=rating_bins, labels=rating_labels, include_lowest=True)
-    rating_dist = filtered['Rating_Bin'].value_counts().sort_index()
+    ratings = Histograms.sorted_values('products', 'Ratings', rows, fillna=0)
     
     rating_data = {
-        'labels': rating_dist.index.tolist(),
-        'values': rating_dist.values.tolist()
+        'labels': rating_labels,
+        'values': Histograms.counts(ratings, rating_bins, right=True, include_lowest=True).tolist()
     }
     
-    # Category distribution
-    category_dist = filtered['Category'].value_counts()
+    # Category distribution (categorical columns also count absent values as 0)
+    category_dist = (products['Category'] if rows is None else products['Category'].take(rows)).value_counts()
+    category_dist = category_dist[category_dist > 0]
     category_data = {
         'labels': category_dist.index.tolist(),
         'values': category_dist.values.tolist()
@@ -171,19 +276,18 @@ def get_product_charts():
     # Review distribution
     review_bins = [0, 100, 500, 1000, 5000, 10000, 100000]
     review_labels = ['0-100', '100-500', '500-1K', '1K-5K', '5K-10K', '10K+']
-    filtered['Review_Bin'] = pd.cut(filtered['Review'], bins=review_bins, labels=review_labels)
-    review_dist = filtered['Review_Bin'].value_counts().sort_index()
+    reviews = Histograms.sorted_values('products', 'Review', rows, fillna=0)
     
     review_data = {
-        'labels': review_dist.index.tolist(),
-        'values': review_dist.values.tolist()
+        'labels': review_labels,
+        'values': Histograms.counts(reviews, review_bins, right=True).tolist()
     }
     
     return jsonify({
         'ratings': rating_data,
         'category': category_data,
         'reviews': review_data,
-        'count': len(filtered)
+        'count': len(products) if rows is None else len(rows)
     })
 
 @bp.route('/charts/suppliers')
@@ -198,27 +302,24 @@ def get_supplier_charts():
         price_min=price_min,
         price_max=price_max,
         rating_min=rating_min,
-        location=location
+        location=location,
+        match=request.args.get('match', 'exact')
     )
     
-    # Replace NaN values with 0
-    filtered = filtered.fillna(0)
+    # Replace missing numbers with 0 (Location and other text columns are categoricals, where 0 is not a valid value)
+    filtered = filtered.fillna({'Price': 0, 'Rating': 0, 'Reviews': 0})
     
     # Location distribution
-    location_dist = filtered['Location'].value_counts().head(10)
+    location_dist = filtered['Location'].value_counts()
+    location_dist = location_dist[location_dist > 0].head(10)
     location_data = {
         'labels': location_dist.index.tolist(),
         'values': location_dist.values.tolist()
     }
     
     
-    # Categories distribution (based on actual product categories from products data)
-    # Load products to get categories
-    products = DataLoader.load_products()
-    
-    # Get categories for products that suppliers are providing
-    supplier_products = filtered['Product Searched'].unique()
-    product_categories = products[products['Product Identifier'].isin(supplier_products)]['Category'].value_counts().head(8)
+    # Categories distribution (categories of the products these suppliers provide)
+    product_categories = DataLoader.get_supplier_category_counts(filtered).head(8)
     
     category_data = {
         'labels': product_categories.index.tolist(),
@@ -278,27 +379,55 @@ def search():
     if len(query) < 2:
         return jsonify({'results': []})
     
-    products = DataLoader.load_products()
-    suppliers = DataLoader.load_suppliers()
-    
-    # Search products
-    product_results = products[
-        products['Title'].str.lower().str.contains(query, na=False) |
-        products['Product Identifier'].str.lower().str.contains(query, na=False)
-    ].head(5)
+    products = DataLoader.load_products(copy=False)
+    suppliers = DataLoader.load_suppliers(copy=False)
+    
+    # fields= applies to both lists; explicit names only need to exist in one of them
+    product_fields = ['Product Identifier', 'Title', 'Price', 'Ratings', 'Image']
+    supplier_fields = ['Supplier Name', 'Location', 'Rating', 'Price']
+    fields = request.args.get('fields')
+    if fields in FIELD_PRESETS['products']:
+        product_fields = FIELD_PRESETS['products'][fields]
+        supplier_fields = FIELD_PRESETS['suppliers'][fields]
+    elif fields:
+        try:
+            names = resolve_fields(fields, products.columns.union(suppliers.columns))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        product_fields = [c for c in names if c in products.columns]
+        supplier_fields = [c for c in names if c in suppliers.columns]
+    
+    if request.args.get('mode') == 'fuzzy':
+        # Similar titles and supplier names, closest first (tolerates typos and spelling variants)
+        product_rows = Filters.fuzzy_rows('products', 'Title', query, products['Review'], limit=5)
+        supplier_rows = Filters.fuzzy_rows('suppliers', 'Supplier Name', query, suppliers['Reviews'], limit=5)
+    else:
+        # Token index lookups, most reviewed first
+        rows = Filters.search_rows('products', ['Title', 'Product Identifier'], query)
+        product_rows = rank_rows(rows, products['Review'], limit=5)
+        rows = Filters.search_rows('suppliers', ['Supplier Name', 'Location'], query)
+        supplier_rows = rank_rows(rows, suppliers['Reviews'], limit=5)
     
-    # Search suppliers
-    supplier_results = suppliers[
-        suppliers['Supplier Name'].str.lower().str.contains(query, na=False) |
-        suppliers['Location'].str.lower().str.contains(query, na=False)
-    ].head(5)
+    product_results = products[product_fields].take(product_rows)
+    supplier_results = suppliers[supplier_fields].take(supplier_rows)
     
     return jsonify({
-        'products': product_results[['Product Identifier', 'Title', 'Price', 'Ratings', 'Image']].to_dict('records'),
-        'suppliers': supplier_results[['Supplier Name', 'Location', 'Rating', 'Price']].to_dict('records')
+        'products': product_results.to_dict('records'),
+        'suppliers': supplier_results.to_dict('records')
     })
 
 
+@bp.route('/typeahead')
+def typeahead():
+    """Search-as-you-type completions (top products and suppliers for a prefix)"""
+    query = request.args.get('q', '')
+    
+    if not query.strip():
+        return jsonify({'products': [], 'suppliers': []})
+    
+    return jsonify(Filters.typeahead(query))
+
+
 # Wishlist API endpoints
 @bp.route('/wishlist', methods=['GET'])
 @login_required
@@ -421,12 +550,13 @@ def analyze_all_products():
     """Get AI analysis for all products"""
     products = AIAnalysis.analyze_all_products()
     
+    try:
+        columns = _fields('ai_products', products.columns) or FIELD_PRESETS['ai_products']['table']
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     # Convert to records
-    result = products[[
-        'Product Identifier', 'Title', 'Image', 'Price', 'Ratings', 'Review',
-        'AI_Total_Score', 'AI_Potential', 'AI_Potential_Color',
-        'AI_Price_Score', 'AI_Rating_Score', 'AI_Sales_Score', 'Category'
-    ]].to_dict('records')
+    result = products[columns].to_dict('records')
     
     return jsonify({
         'products': result,
@@ -53,7 +53,8 @@ def products():
         price_max=price_max,
         rating_min=rating_min,
         category=category,
-        search_term=search
+        search_term=search,
+        match=request.args.get('match', 'exact')
     )
     
     products_list = filtered_products.to_dict('records')
@@ -85,7 +86,8 @@ def suppliers():
         rating_min=rating_min,
         location=location,
         category=category,
-        search_term=search
+        search_term=search,
+        match=request.args.get('match', 'exact')
     )
     
     suppliers_list = filtered_suppliers.to_dict('records')
@@ -101,8 +103,8 @@ def suppliers():
 @login_required
 def comparisons():
     """Comparison dashboard"""
-    products = DataLoader.load_products()
-    suppliers = DataLoader.load_suppliers()
+    products = DataLoader.load_products(copy=False)
+    suppliers = DataLoader.load_suppliers(copy=False)
     
     product_list = products['Product Identifier'].unique().tolist()
     supplier_list = suppliers['Supplier Name'].unique().tolist()
@@ -145,7 +147,7 @@ def product_detail(product_id):
     comparison = Comparisons.product_vs_suppliers(product_id)
     
     # Get similar products (same category)
-    all_products = DataLoader.load_products()
+    all_products = DataLoader.load_products(copy=False)
     category = product.get('Category', '')
     similar = all_products[
         (all_products['Category'] == category) & 
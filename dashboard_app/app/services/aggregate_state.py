@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from app.services.quantile_sketch import QuantileSketch
+
+
+# Columns of a partial state, per value column, and how two states combine
+STATE_FIELDS = {'n': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def partial_state(values, groups):
+    """Mergeable aggregate state of numeric columns per group
+    
+    values is a frame of numeric columns and groups the group label of each
+    row. Returns a frame indexed by group with the row count in ('rows', 'n')
+    and, for each value column c, (c, 'n'), (c, 'sum'), (c, 'sumsq'),
+    (c, 'min') and (c, 'max'), where n counts non-missing values. States of
+    disjoint row sets combine with merge_states.
+    """
+    values = values.astype('float64')
+    grouped = values.groupby(groups, observed=True)
+    squares = (values ** 2).groupby(groups, observed=True)
+    
+    state = pd.concat({
+        'n': grouped.count(),
+        'sum': grouped.sum(),
+        'sumsq': squares.sum(),
+        'min': grouped.min(),
+        'max': grouped.max()
+    }, axis=1).swaplevel(axis=1)
+    state[('rows', 'n')] = grouped.size()
+    state.index = state.index.astype(object)
+    return state
+
+
+def merge_states(states):
+    """Combine partial states of disjoint row sets (per group)"""
+    states = [state for state in states if state is not None and len(state)]
+    if not states:
+        return None
+    combined = pd.concat(states)
+    how = {column: STATE_FIELDS[column[1]] for column in combined.columns}
+    return combined.groupby(level=0, sort=True).agg(how)
+
+
+def mean(state, column):
+    """Mean of column per group (NaN where it has no values)"""
+    n = state[(column, 'n')]
+    return state[(column, 'sum')] / n.where(n > 0)
+
+
+def std(state, column):
+    """Sample standard deviation of column per group (NaN with fewer than two values)"""
+    n = state[(column, 'n')]
+    total = state[(column, 'sum')]
+    variance = (state[(column, 'sumsq')] - total ** 2 / n.where(n > 0)) / (n - 1).where(n > 1)
+    return np.sqrt(variance.clip(lower=0))
+
+
+def group_sketches(values, groups):
+    """Quantile sketch of values per group label"""
+    return {label: QuantileSketch.from_values(group.to_numpy())
+            for label, group in values.groupby(groups, observed=True)}
+
+
+def merge_sketches(partials):
+    """Combine per-group sketches of disjoint row sets"""
+    merged = {}
+    for sketches in partials:
+        for label, sketch in sketches.items():
+            merged[label] = merged[label].merge(sketch) if label in merged else sketch
+    return dict(sorted(merged.items()))
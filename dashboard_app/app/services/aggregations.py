@@ -1,127 +1,262 @@
 import pandas as pd
 import numpy as np
+from datetime import datetime
 from app.services.data_loader import DataLoader
+from app.services.aggregate_state import partial_state, merge_states, mean, std, group_sketches, merge_sketches
+from app.services.histograms import Histograms
+from app.utils.constants import TOP_K_CAP
+
+
+# Ranking key -> (column, ascending) for the precomputed top-K lists
+TOP_RANKINGS = {
+    'products': {
+        'ratings': ('Ratings', False),
+        'reviews': ('Review', False),
+        'sales': ('Sales_Number', False),
+        'price': ('Price', False),
+        'price_low': ('Price', True),
+        'best_sellers': ('Sales_Parsed', False)
+    },
+    'suppliers': {
+        'rating': ('Rating', False),
+        'reviews': ('Reviews', False),
+        'price_low': ('Price', True)
+    }
+}
+
 
 class Aggregations:
     """Service for computing KPIs and aggregated metrics"""
     
+    _partials = {}  # (dataset, file, fingerprint) -> partial aggregates of that file's rows
+    
+    @staticmethod
+    def get_kpis():
+        """Overview, category and location KPIs, materialized once per dataset version
+        
+        Built right after each load (see DataLoader.materialize) and stamped
+        with the dataset version it was computed from.
+        """
+        return DataLoader.derived('kpis', Aggregations._build_kpis)
+    
+    @staticmethod
+    def _build_kpis():
+        products = DataLoader.load_products(copy=False)
+        suppliers = DataLoader.load_suppliers(copy=False)
+        
+        # Merge the per-file partial states; only files new since the last load are aggregated
+        product_states = Aggregations._file_states('products', products, Aggregations._product_state)
+        supplier_states = Aggregations._file_states('suppliers', suppliers, Aggregations._supplier_state)
+        
+        location_names = {}
+        for state in supplier_states:
+            for location, names in state['location_names'].items():
+                location_names[location] = location_names.get(location, set()) | names
+        
+        return {
+            'version': DataLoader.get_dataset_version(),
+            'computed_at': datetime.now().isoformat(),
+            'overview': Aggregations._overview_stats(
+                merge_states([state['total'] for state in product_states]),
+                merge_states([state['total'] for state in supplier_states]),
+                set().union(*(state['names'] for state in supplier_states))
+            ),
+            'categories': Aggregations._category_breakdown(merge_states([state['categories'] for state in product_states])),
+            'locations': Aggregations._location_stats(merge_states([state['locations'] for state in supplier_states]), location_names),
+            'sketches': {
+                dataset: {column: merge_sketches([state['sketches'][column] for state in states]) for column in ('price', 'rating')}
+                for dataset, states in (('products', product_states), ('suppliers', supplier_states))
+            }
+        }
+    
+    @staticmethod
+    def _file_states(dataset, df, build):
+        """Partial aggregate state of each source file of a dataset
+        
+        States are kept across reloads under the file's fingerprint, so after a
+        partial reload only the rows of added or changed files are aggregated.
+        """
+        parts = DataLoader.get_parts(dataset)
+        if not parts:
+            return [build(df)]
+        
+        states = {}
+        for part in parts:
+            key = (dataset, part['file'], tuple(part['fingerprint']))
+            state = Aggregations._partials.get(key)
+            states[key] = state if state is not None else build(df.iloc[part['start']:part['stop']])
+        
+        # Drop the states of this dataset's replaced or removed files
+        kept = {key: state for key, state in Aggregations._partials.items() if key[0] != dataset}
+        Aggregations._partials = {**kept, **states}
+        return list(states.values())
+    
+    @staticmethod
+    def _product_state(products):
+        """Partial aggregates of product rows: overall and per category"""
+        values = products[['Price', 'Ratings', 'Review']].assign(Listed=products['Product Identifier'].notna())
+        return {
+            'total': partial_state(values, np.zeros(len(products), dtype=np.int8)),
+            'categories': partial_state(values, products['Category']),
+            'sketches': {
+                'price': group_sketches(products['Price'], products['Category']),
+                'rating': group_sketches(products['Ratings'], products['Category'])
+            }
+        }
+    
+    @staticmethod
+    def _supplier_state(suppliers):
+        """Partial aggregates of supplier rows: overall and per location, plus the distinct names"""
+        values = suppliers[['Price', 'Rating', 'Reviews']]
+        names = suppliers['Supplier Name']
+        return {
+            'total': partial_state(values, np.zeros(len(suppliers), dtype=np.int8)),
+            'locations': partial_state(values, suppliers['Location']),
+            'names': set(names.unique()),
+            'location_names': {location: set(group) for location, group in names.dropna().groupby(suppliers['Location'], observed=True)},
+            'sketches': {
+                'price': group_sketches(suppliers['Price'], suppliers['Location']),
+                'rating': group_sketches(suppliers['Rating'], suppliers['Location'])
+            }
+        }
+    
+    @staticmethod
+    def get_percentiles(dataset='products', column='price', quantiles=(0.5, 0.9, 0.99)):
+        """Estimated price or rating quantiles per category (products) or location (suppliers), and overall
+        
+        Answered from the quantile sketches kept with the KPIs, so no column is
+        sorted per request; values are approximate (see QuantileSketch).
+        """
+        sketches = Aggregations.get_kpis()['sketches'][dataset][column]
+        names = [f'p{q * 100:g}' for q in quantiles]
+        
+        def summary(sketch):
+            values = sketch.quantile(quantiles)
+            return dict({'count': sketch.count},
+                        **{name: None if np.isnan(value) else round(float(value), 2) for name, value in zip(names, values)})
+        
+        overall = merge_sketches([{'all': sketch} for sketch in sketches.values()]).get('all')
+        return {
+            'dataset': dataset,
+            'column': column,
+            'group_by': 'category' if dataset == 'products' else 'location',
+            'quantiles': names,
+            'overall': summary(overall) if overall is not None else None,
+            'groups': [dict({'group': label}, **summary(sketch)) for label, sketch in sketches.items()]
+        }
+    
     @staticmethod
     def get_overview_stats():
         """Get high-level overview statistics"""
-        products = DataLoader.load_products()
-        suppliers = DataLoader.load_suppliers()
-        
+        return Aggregations.get_kpis()['overview']
+    
+    @staticmethod
+    def _overview_stats(products, suppliers, supplier_names):
         # Calculate total sales in millions
-        total_sales = products['Price'].sum()
+        total_sales = products[('Price', 'sum')].iloc[0]
         total_sales_millions = total_sales / 1000000
         
         stats = {
-            'total_products': len(products),
-            'total_suppliers': len(suppliers['Supplier Name'].unique()),
-            'avg_product_price': float(products['Price'].mean()),
-            'avg_supplier_price': float(suppliers['Price'].mean()),
-            'avg_product_rating': float(products['Ratings'].mean()),
-            'avg_supplier_rating': float(suppliers['Rating'].mean()),
-            'total_reviews': int(products['Review'].sum()),
-            'total_supplier_reviews': int(suppliers['Reviews'].sum()),
+            'total_products': int(products[('rows', 'n')].iloc[0]),
+            'total_suppliers': len(supplier_names),
+            'avg_product_price': float(mean(products, 'Price').iloc[0]),
+            'avg_supplier_price': float(mean(suppliers, 'Price').iloc[0]),
+            'avg_product_rating': float(mean(products, 'Ratings').iloc[0]),
+            'avg_supplier_rating': float(mean(suppliers, 'Rating').iloc[0]),
+            'total_reviews': int(products[('Review', 'sum')].iloc[0]),
+            'total_supplier_reviews': int(suppliers[('Reviews', 'sum')].iloc[0]),
             'total_sales_millions': float(total_sales_millions),
             'price_range': {
-                'min': float(products['Price'].min()),
-                'max': float(products['Price'].max())
+                'min': float(products[('Price', 'min')].iloc[0]),
+                'max': float(products[('Price', 'max')].iloc[0])
             }
         }
         
         return stats
     
     @staticmethod
-    def get_top_products(limit=5, sort_by='ratings'):
-        """Get top products by various metrics"""
-        products = DataLoader.load_products()
-        
-        if sort_by == 'ratings':
-            top = products.nlargest(limit, 'Ratings')
-        elif sort_by == 'reviews':
-            top = products.nlargest(limit, 'Review')
-        elif sort_by == 'sales':
-            top = products.nlargest(limit, 'Sales_Number')
-        elif sort_by == 'price':
-            top = products.nlargest(limit, 'Price')
-        elif sort_by == 'price_low':
-            top = products.nsmallest(limit, 'Price')
+    def _top_rows(dataset, key):
+        """Row positions of the best TOP_K_CAP rows for a ranking key, best first
+        
+        Built once per dataset version. Missing values are left out and ties keep
+        row order, as nlargest/nsmallest do, so the first n entries are exactly
+        the rows nlargest(n) would return.
+        """
+        def build():
+            if dataset == 'products':
+                frame = DataLoader.load_products(copy=False)
+            else:
+                frame = Aggregations._supplier_table()
+            column, ascending = TOP_RANKINGS[dataset][key]
+            values = frame[column].reset_index(drop=True).dropna()
+            return values.sort_values(ascending=ascending, kind='stable').index.to_numpy()[:TOP_K_CAP]
+        return DataLoader.derived(('top_rows', dataset, key), build)
+    
+    @staticmethod
+    def _top(frame, dataset, key, limit):
+        """The top limit rows of frame for a ranking key (a slice of the ranking up to TOP_K_CAP)"""
+        limit = max(limit, 0)
+        if limit > TOP_K_CAP:
+            column, ascending = TOP_RANKINGS[dataset][key]
+            return frame.nsmallest(limit, column) if ascending else frame.nlargest(limit, column)
+        return frame.take(Aggregations._top_rows(dataset, key)[:limit])
+    
+    @staticmethod
+    def get_top_products(limit=5, sort_by='ratings', fields=None):
+        """Get top products by various metrics (only the given columns when fields is set)"""
+        products = DataLoader.load_products(copy=False)
+        
+        if sort_by in ('ratings', 'reviews', 'sales', 'price', 'price_low'):
+            top = Aggregations._top(products, 'products', sort_by, limit)
         else:
             top = products.head(limit)
         
+        if fields is not None:
+            top = top[fields]
         return top.to_dict('records')
     
     @staticmethod
     def get_top_rated_products(limit=5, min_rating=4.5):
         """Get top rated products above a minimum rating threshold"""
-        products = DataLoader.load_products()
+        products = DataLoader.load_products(copy=False)
         
-        # Filter products by minimum rating
-        filtered = products[products['Ratings'] >= min_rating]
-        
-        # Sort by ratings and return top N
-        top = filtered.nlargest(limit, 'Ratings')
+        # The ratings ranking is sorted, so the products above the threshold are a prefix of it
+        top = Aggregations._top(products, 'products', 'ratings', limit)
+        top = top[top['Ratings'] >= min_rating]
         
         return top.to_dict('records')
     
     @staticmethod
     def get_best_sellers(limit=5):
         """Get best selling products by monthly sales"""
-        products = DataLoader.load_products()
-        
-        # Helper function to parse sales values (handles K, M notations)
-        def parse_sales(value):
-            if pd.isna(value) or value is None:
-                return 0
-            if isinstance(value, str):
-                value = value.strip().upper()
-                try:
-                    if 'K' in value:
-                        return float(value.replace('K', '').replace(',', '')) * 1000
-                    elif 'M' in value:
-                        return float(value.replace('M', '').replace(',', '')) * 1000000
-                    else:
-                        # Remove any text and extract numbers
-                        import re
-                        match = re.search(r'\d+', value)
-                        if match:
-                            return float(match.group())
-                        return 0
-                except (ValueError, AttributeError):
-                    return 0
-            try:
-                return float(value) if value > 0 else 0
-            except (ValueError, TypeError):
-                return 0
-        
-        # Parse monthly sales and sort
-        products['Sales_Parsed'] = products['Monthly Sales'].apply(parse_sales)
-        top = products.nlargest(limit, 'Sales_Parsed')
+        products = DataLoader.load_products(copy=False)
+        
+        # Sales_Parsed (K/M notation applied) is computed once at load
+        top = Aggregations._top(products, 'products', 'best_sellers', limit)
         
         return top.to_dict('records')
     
+    @staticmethod
+    def _supplier_table():
+        """Suppliers aggregated by name, built once per dataset version"""
+        def build():
+            suppliers = DataLoader.load_suppliers(copy=False)
+            return suppliers.groupby('Supplier Name', observed=True).agg({
+                'Rating': 'mean',
+                'Reviews': 'sum',
+                'Price': 'mean',
+                'Location': 'first',
+                'Contact Phone': 'first'
+            }).reset_index()
+        return DataLoader.derived('supplier_table', build)
+    
     @staticmethod
     def get_top_suppliers(limit=5, sort_by='rating'):
         """Get top suppliers by various metrics"""
-        suppliers = DataLoader.load_suppliers()
-        
-        # Aggregate by supplier name
-        agg_suppliers = suppliers.groupby('Supplier Name').agg({
-            'Rating': 'mean',
-            'Reviews': 'sum',
-            'Price': 'mean',
-            'Location': 'first',
-            'Contact Phone': 'first'
-        }).reset_index()
-        
-        if sort_by == 'rating':
-            top = agg_suppliers.nlargest(limit, 'Rating')
-        elif sort_by == 'reviews':
-            top = agg_suppliers.nlargest(limit, 'Reviews')
-        elif sort_by == 'price_low':
-            top = agg_suppliers.nsmallest(limit, 'Price')
+        agg_suppliers = Aggregations._supplier_table()
+        
+        if sort_by in ('rating', 'reviews', 'price_low'):
+            top = Aggregations._top(agg_suppliers, 'suppliers', sort_by, limit)
         else:
             top = agg_suppliers.head(limit)
         
@@ -130,33 +265,40 @@ class Aggregations:
     @staticmethod
     def get_category_breakdown():
         """Get product distribution by category"""
-        products = DataLoader.load_products()
-        category_stats = products.groupby('Category').agg({
-            'Price': ['mean', 'min', 'max'],
-            'Ratings': 'mean',
-            'Review': 'sum',
-            'Product Identifier': 'count'
+        return Aggregations.get_kpis()['categories']
+    
+    @staticmethod
+    def _category_breakdown(state):
+        category_stats = pd.DataFrame({
+            'count': state[('Listed', 'sum')],
+            'avg_price': mean(state, 'Price'),
+            'min_price': state[('Price', 'min')],
+            'max_price': state[('Price', 'max')],
+            'std_price': std(state, 'Price'),
+            'avg_rating': mean(state, 'Ratings'),
+            'total_reviews': state[('Review', 'sum')]
         }).round(2)
         
         result = []
-        for category in category_stats.index:
+        for category, row in category_stats.iterrows():
             result.append({
                 'category': category,
-                'count': int(category_stats.loc[category, ('Product Identifier', 'count')]),
-                'avg_price': float(category_stats.loc[category, ('Price', 'mean')]),
-                'min_price': float(category_stats.loc[category, ('Price', 'min')]),
-                'max_price': float(category_stats.loc[category, ('Price', 'max')]),
-                'avg_rating': float(category_stats.loc[category, ('Ratings', 'mean')]),
-                'total_reviews': int(category_stats.loc[category, ('Review', 'sum')])
+                'count': int(row['count']),
+                'avg_price': float(row['avg_price']),
+                'min_price': float(row['min_price']),
+                'max_price': float(row['max_price']),
+                'std_price': float(row['std_price']),
+                'avg_rating': float(row['avg_rating']),
+                'total_reviews': int(row['total_reviews'])
             })
         
         return result
     
     @staticmethod
-    def get_price_distribution(bins=10):
-        """Get price distribution data for charts"""
-        products = DataLoader.load_products()
-        hist, edges = np.histogram(products['Price'], bins=bins)
+    def get_price_distribution(bins=10, rows=None):
+        """Get price distribution data for charts (of the given product row ids, or all)"""
+        prices = Histograms.sorted_values('products', 'Price', rows)
+        hist, edges = Histograms.uniform(prices, bins)
         
         return {
             'bins': [f"₹{int(edges[i])}-{int(edges[i+1])}" for i in range(len(edges)-1)],
@@ -166,28 +308,32 @@ class Aggregations:
     @staticmethod
     def get_rating_distribution():
         """Get rating distribution"""
-        products = DataLoader.load_products()
         rating_bins = [0, 2, 3, 4, 4.5, 5]
         labels = ['0-2', '2-3', '3-4', '4-4.5', '4.5-5']
         
-        products['Rating_Bin'] = pd.cut(products['Ratings'], bins=rating_bins, labels=labels)
-        distribution = products['Rating_Bin'].value_counts().sort_index()
+        ratings = Histograms.sorted_values('products', 'Ratings')
+        counts = Histograms.counts(ratings, rating_bins, right=True)
         
         return {
-            'labels': distribution.index.tolist(),
-            'counts': distribution.values.tolist()
+            'labels': labels,
+            'counts': counts.tolist()
         }
     
     @staticmethod
     def get_supplier_location_stats():
         """Get supplier statistics by location"""
-        suppliers = DataLoader.load_suppliers()
-        location_stats = suppliers.groupby('Location').agg({
-            'Supplier Name': 'nunique',
-            'Price': 'mean',
-            'Rating': 'mean',
-            'Reviews': 'sum'
-        }).round(2).reset_index()
-        
-        location_stats.columns = ['location', 'supplier_count', 'avg_price', 'avg_rating', 'total_reviews']
-        return location_stats.to_dict('records')
\ No newline at end of file
+        return Aggregations.get_kpis()['locations']
+    
+    @staticmethod
+    def _location_stats(state, location_names):
+        location_stats = pd.DataFrame({
+            'location': state.index,
+            'supplier_count': [len(location_names.get(location, ())) for location in state.index],
+            'avg_price': mean(state, 'Price').to_numpy(),
+            'avg_rating': mean(state, 'Rating').to_numpy(),
+            'total_reviews': state[('Reviews', 'sum')].to_numpy().astype(np.int64)
+        }).round(2)
+        
+        return location_stats.to_dict('records')
+
+DataLoader.materialize('kpis', Aggregations._build_kpis)
@@ -39,6 +39,7 @@ Total Score Classification:
 
 import pandas as pd
 from app.services.data_loader import DataLoader
+from app.services.parsers import parse_sales_value
 
 
 class AIAnalysis:
@@ -227,20 +228,9 @@ class AIAnalysis:
         else:
             # Handle if Monthly Sales is a string (e.g., "1.2K", "500", "700+ BOUGHT IN PAST MONTH")
             if isinstance(sales, str):
-                import re
-                sales = sales.strip().upper()
-                # Extract numeric value with optional decimal and K/M suffix
-                match = re.search(r'(\d+\.?\d*)\s*([KM])?', sales)
-                if match:
-                    number = float(match.group(1))
-                    suffix = match.group(2)
-                    if suffix == 'K':
-                        sales = number * 1000
-                    elif suffix == 'M':
-                        sales = number * 1000000
-                    else:
-                        sales = number
-                else:
+                # Numeric value with optional decimal and K/M suffix
+                sales = parse_sales_value(sales)
+                if sales is None:
                     missing_data.append('Monthly Sales')
                     sales = 0
             else:
@@ -315,43 +305,26 @@ class AIAnalysis:
         Returns:
             pd.DataFrame: Products with analysis scores
         """
-        products = DataLoader.load_products()
-        
-        # Helper function to parse sales values
-        def parse_sales(value):
-            if pd.isna(value) or value is None:
-                return 0
-            if isinstance(value, str):
-                value = value.strip().upper()
-                try:
-                    if 'K' in value:
-                        return float(value.replace('K', '').replace(',', '')) * 1000
-                    elif 'M' in value:
-                        return float(value.replace('M', '').replace(',', '')) * 1000000
-                    else:
-                        return float(value.replace(',', ''))
-                except (ValueError, AttributeError):
-                    return 0
-            try:
-                return float(value) if value > 0 else 0
-            except (ValueError, TypeError):
-                return 0
+        products = DataLoader.load_products(copy=False)
         
         # Calculate scores for all products
-        products['AI_Price_Score'] = products['Price'].apply(cls.calculate_price_score)
-        products['AI_Rating_Score'] = products['Ratings'].apply(cls.calculate_rating_score)
-        products['AI_Reviews_Score'] = products['Review'].apply(cls.calculate_reviews_score)
-        products['AI_Sales_Score'] = products['Monthly Sales'].apply(lambda x: cls.calculate_sales_score(parse_sales(x)))
-        products['AI_Total_Score'] = (
-            products['AI_Price_Score'] + 
-            products['AI_Rating_Score'] + 
-            products['AI_Reviews_Score'] +
-            products['AI_Sales_Score']
+        scores = pd.DataFrame({
+            'AI_Price_Score': products['Price'].apply(cls.calculate_price_score),
+            'AI_Rating_Score': products['Ratings'].apply(cls.calculate_rating_score),
+            'AI_Reviews_Score': products['Review'].apply(cls.calculate_reviews_score),
+            'AI_Sales_Score': products['Sales_Parsed'].apply(cls.calculate_sales_score)
+        })
+        scores['AI_Total_Score'] = (
+            scores['AI_Price_Score'] + 
+            scores['AI_Rating_Score'] + 
+            scores['AI_Reviews_Score'] +
+            scores['AI_Sales_Score']
         )
-        products['AI_Potential'] = products['AI_Total_Score'].apply(cls.classify_potential)
-        products['AI_Potential_Color'] = products['AI_Potential'].apply(cls.get_potential_color)
+        scores['AI_Potential'] = scores['AI_Total_Score'].apply(cls.classify_potential)
+        scores['AI_Potential_Color'] = scores['AI_Potential'].apply(cls.get_potential_color)
         
-        return products
+        # Only the score columns are allocated; product columns stay shared with the cache
+        return products.assign(**scores)
     
     @classmethod
     def get_potential_distribution(cls):
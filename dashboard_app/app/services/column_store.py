@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+class _Column:
+    """One growable column: numbers in a numpy buffer, text as codes into a label table"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.kind = None      # 'numeric' or 'text', decided by the first non-empty chunk
+        self.values = None    # numeric buffer, or int32 codes for text
+        self.labels = {}      # text label -> code
+    
+    def _reserve(self, size, dtype):
+        if self.values is None:
+            self.values = np.empty(max(self.capacity, size), dtype=dtype)
+        elif size > len(self.values):
+            grown = np.empty(max(size, 2 * len(self.values)), dtype=self.values.dtype)
+            grown[:len(self.values)] = self.values
+            self.values = grown
+        if self.values.dtype != dtype and self.kind == 'numeric':
+            self.values = self.values.astype(np.result_type(self.values.dtype, dtype))
+    
+    def append(self, series, start):
+        stop = start + len(series)
+        
+        if self.kind is None and series.isna().all():
+            # Nothing to learn from an all-empty chunk yet; keep it as missing numbers
+            self._reserve(stop, np.float64)
+            self.values[start:stop] = np.nan
+            return
+        if self.kind is None:
+            numeric = pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+            self.kind = 'numeric' if numeric else 'text'
+            if self.kind == 'text' and self.values is not None:
+                self.values = np.full(len(self.values), -1, dtype=np.int32)
+        
+        if self.kind == 'text':
+            if series.isna().all():
+                codes = np.full(len(series), -1, dtype=np.int32)
+            else:
+                codes, uniques = pd.factorize(series.astype(str).where(series.notna()))
+                mapping = np.array([self.labels.setdefault(u, len(self.labels)) for u in uniques] + [-1],
+                                   dtype=np.int32)
+                codes = mapping[codes]
+            self._reserve(stop, np.int32)
+            self.values[start:stop] = codes
+        else:
+            values = series.to_numpy()
+            if values.dtype == object:
+                # A numeric column turned textual part way through; keep it as missing numbers
+                values = pd.to_numeric(series, errors='coerce').to_numpy()
+            self._reserve(stop, values.dtype)
+            self.values[start:stop] = values
+    
+    def finish(self, rows, categorical, max_unique_ratio):
+        if self.values is None:
+            return np.full(rows, np.nan)
+        # Copy out of an oversized buffer so the spare capacity is released
+        values = self.values[:rows].copy() if len(self.values) > rows else self.values
+        if self.kind != 'text':
+            return values
+        
+        # Sort labels so categories come out as they would from astype('category')
+        labels = np.array(list(self.labels), dtype=object)
+        order = np.argsort(labels.astype(str), kind='stable')
+        remap = np.empty(len(labels) + 1, dtype=np.int32)
+        remap[order] = np.arange(len(labels), dtype=np.int32)
+        remap[-1] = -1
+        codes = remap[values]
+        labels = labels[order]
+        
+        if categorical and len(labels) <= max_unique_ratio * rows:
+            return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(labels))
+        
+        text = labels[codes] if len(labels) else np.empty(rows, dtype=object)
+        text[codes == -1] = np.nan
+        return pd.Series(text)
+
+
+class ColumnStore:
+    """Append-only columnar store that builds a compact DataFrame chunk by chunk
+    
+    Buffers are preallocated for the expected row count and grow by doubling if
+    it is exceeded; text is dictionary-encoded as it arrives, so memory held
+    between chunks is the compact columns plus the chunk being appended.
+    """
+    
+    def __init__(self, expected_rows=0):
+        self.capacity = max(int(expected_rows), 1)
+        self.rows = 0
+        self.columns = {}
+    
+    def append(self, df):
+        for name in df.columns:
+            if name not in self.columns:
+                column = _Column(self.capacity)
+                if self.rows:
+                    # Column first seen part way through: earlier rows are missing
+                    column.append(pd.Series(np.nan, index=range(self.rows)), 0)
+                self.columns[name] = column
+            self.columns[name].append(df[name], self.rows)
+        
+        for name, column in self.columns.items():
+            if name not in df.columns:
+                column.append(pd.Series(np.nan, index=range(len(df))), self.rows)
+        self.rows += len(df)
+    
+    def to_frame(self, categorical=(), max_unique_ratio=1.0):
+        """Build the frame; text columns listed in categorical become categoricals"""
+        data = {name: column.finish(self.rows, name in categorical, max_unique_ratio)
+                for name, column in self.columns.items()}
+        return pd.DataFrame(data, index=pd.RangeIndex(self.rows), copy=False)
+    
+    @staticmethod
+    def estimate_rows(path, block_size=1 << 20):
+        """Count lines in a file without loading it (quoted newlines make this an upper bound)"""
+        lines = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                lines += block.count(b'\n')
+        return max(lines - 1, 0)
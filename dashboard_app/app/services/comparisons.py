@@ -11,7 +11,7 @@ class Comparisons:
         if not product_identifiers:
             return []
         
-        products = DataLoader.load_products()
+        products = DataLoader.load_products(copy=False)
         compared = products[products['Product Identifier'].isin(product_identifiers)]
         
         # Replace NaN values with None before converting to dict
@@ -46,11 +46,11 @@ class Comparisons:
         if not supplier_names:
             return []
         
-        suppliers = DataLoader.load_suppliers()
+        suppliers = DataLoader.load_suppliers(copy=False)
         compared = suppliers[suppliers['Supplier Name'].isin(supplier_names)]
         
         # Aggregate by supplier
-        agg = compared.groupby('Supplier Name').agg({
+        agg = compared.groupby('Supplier Name', observed=True).agg({
             'Rating': 'mean',
             'Reviews': 'sum',
             'Location': 'first',
@@ -79,8 +79,7 @@ class Comparisons:
     @staticmethod
     def product_vs_suppliers(product_identifier):
         """Compare product with its suppliers"""
-        product = DataLoader.get_product_by_identifier(product_identifier)
-        suppliers = DataLoader.get_suppliers_for_product(product_identifier)
+        product, suppliers = DataLoader.get_product_with_suppliers(product_identifier)
         
         if product is None or suppliers.empty:
             return None
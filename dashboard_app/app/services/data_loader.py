@@ -1,9 +1,185 @@
 import pandas as pd
+import numpy as np
 import os
 from flask import current_app
 import json
 from datetime import datetime
 import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.services.snapshot import SnapshotStore
+from app.services.column_store import ColumnStore
+from app.services.indexes import TokenIndex, TrigramIndex, SortedIndex, BitmapIndex
+from app.services.parsers import parse_price, parse_rating, parse_count, parse_sales
+
+# Views returned with copy=False rely on copy-on-write (always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+# Raw columns the cleaning needs; files missing one get it as all-NaN, as a concat would
+RAW_PRODUCT_COLUMNS = ['Image', 'Title', 'Ratings', 'Review', 'Monthly Sales', 'Price']
+
+
+def clean_products(df):
+    """Clean a raw product frame (one category file or several concatenated)"""
+    # Normalize column names (defensive, handles invisible chars on Linux)
+    df.columns = df.columns.str.strip()
+    
+    present = {c.lower() for c in df.columns}
+    for column in RAW_PRODUCT_COLUMNS:
+        if column.lower() not in present:
+            df[column] = float('nan')
+    
+    # Handle text fields - convert to string and fill NaN
+    # Use case-insensitive column lookup to handle any encoding variation
+    title_col = next((c for c in df.columns if c.lower().strip() == 'title'), 'Title')
+    image_col = next((c for c in df.columns if c.lower().strip() == 'image'), 'Image')
+    df['Title'] = df[title_col].fillna('').astype(str).str.strip()
+    df['Title'] = df['Title'].replace('', 'Unknown Product')  # only truly empty titles
+    df['Image'] = df[image_col].fillna('').astype(str)
+    
+    # Parse numeric fields (each parser works on the distinct values only)
+    df['Price'] = parse_price(df['Price'])
+    df['Ratings'] = parse_rating(df['Ratings'])
+    df['Review'] = parse_count(df['Review'])
+    
+    # Monthly sales: leading number, and the K/M-aware value used for rankings and scores
+    df['Monthly Sales'] = df['Monthly Sales'].fillna('0').astype(str)
+    df['Sales_Number'], df['Sales_Parsed'] = parse_sales(df['Monthly Sales'])
+    
+    # Use Product Identified as Product Identifier (fix typo in CSV)
+    if 'Product Identified' in df.columns and 'Product Identifier' not in df.columns:
+        df['Product Identifier'] = df['Product Identified'].fillna('Unknown').astype(str)
+    elif 'Product Identifier' in df.columns:
+        df['Product Identifier'] = df['Product Identifier'].fillna('Unknown').astype(str)
+    else:
+        # Create Product Identifier from Title if neither exists
+        df['Product Identifier'] = df['Title'].str[:50]
+    
+    return df
+
+
+# Compact storage per dataset: low-cardinality text columns become categoricals,
+# numeric columns are downcast where lossless, unused CSV leftovers are dropped
+COMPACT_COLUMNS = {
+    'products': {
+        'categorical': ['Category', 'Product Identifier'],
+        'downcast': ['Review', 'Sales_Number', 'Sales_Parsed', 'Ratings'],
+        'drop': ['Tiitle', 'Review.1', 'Product Identified']
+    },
+    'suppliers': {
+        'categorical': ['Location', 'Supplier Name', 'Product Searched', 'Product Identifier'],
+        'downcast': ['Reviews', 'Supplier Round', 'Rating', 'Supplier_Rank'],
+        'drop': []
+    }
+}
+
+# Text columns only become categoricals when values repeat at least this much
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_frame(df, categorical=(), downcast=(), drop=()):
+    """Convert a cleaned frame to compact dtypes; returns (frame, memory report)"""
+    before = df.memory_usage(index=False, deep=True)
+    dtypes_before = df.dtypes.astype(str)
+    
+    df = df.drop(columns=[c for c in drop if c in df.columns])
+    
+    for column in categorical:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            if df[column].nunique() <= CATEGORICAL_MAX_UNIQUE_RATIO * len(df):
+                df[column] = df[column].astype('category')
+    
+    for column in downcast:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            df[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values.dtype):
+            # Only downcast floats that survive the round trip (4.4 does not in float32)
+            smaller = values.astype('float32')
+            if smaller.astype(values.dtype).equals(values):
+                df[column] = smaller
+    
+    after = df.memory_usage(index=False, deep=True)
+    columns = []
+    for column in before.index:
+        columns.append({
+            'column': column,
+            'dtype_before': dtypes_before[column],
+            'dtype_after': str(df[column].dtype) if column in df.columns else None,
+            'bytes_before': int(before[column]),
+            'bytes_after': int(after.get(column, 0))
+        })
+    
+    report = {
+        'rows': len(df),
+        'bytes_before': int(before.sum()),
+        'bytes_after': int(after.sum()),
+        'dropped': [c for c in drop if c in before.index],
+        'columns': columns
+    }
+    return df, report
+
+
+def clean_suppliers(df):
+    """Clean a raw supplier frame (or one chunk of it)"""
+    df.columns = df.columns.str.strip()
+    
+    # Clean and process data
+    df['Price'] = df['Price'].fillna('₹ 0').astype(str).str.replace('₹', '').str.replace(',', '').str.split('/').str[0].astype(float)
+    df['Rating'] = df['Rating'].fillna(0).astype(float)
+    df['Reviews'] = df['Reviews'].fillna(0).astype(int)
+    
+    return df
+
+
+def read_supplier_chunks(csv_file, chunk_size):
+    """Stream the supplier CSV chunk by chunk into a compact column store
+    
+    Each chunk is cleaned and appended as it is read, so peak memory is the
+    compact result plus one raw chunk instead of the whole raw file.
+    """
+    store = ColumnStore(expected_rows=ColumnStore.estimate_rows(csv_file))
+    with pd.read_csv(csv_file, encoding='utf-8-sig', chunksize=chunk_size) as reader:
+        for chunk in reader:
+            store.append(clean_suppliers(chunk))
+    
+    return store.to_frame(categorical=COMPACT_COLUMNS['suppliers']['categorical'],
+                          max_unique_ratio=CATEGORICAL_MAX_UNIQUE_RATIO)
+
+
+def read_product_file(csv_file):
+    """Read and clean one category CSV; returns (frame or None, report entry)
+    
+    Kept at module level so it can run in a process pool.
+    """
+    started = time.perf_counter()
+    entry = {'file': os.path.basename(csv_file), 'rows': 0, 'seconds': 0.0, 'error': None}
+    
+    try:
+        df = pd.read_csv(csv_file, encoding='utf-8-sig')
+        
+        # Strip whitespace from column names (handles invisible chars on Linux)
+        df.columns = df.columns.str.strip()
+        
+        # Extract category from filename (e.g., "Car and Automobiles - P C.csv" -> "Car and Automobiles")
+        category = entry['file'].replace(' - P C.csv', '').replace('.csv', '')
+        
+        # Add category column
+        df['Category'] = category
+        
+        df = clean_products(df)
+        entry['rows'] = len(df)
+    except Exception as e:
+        df = None
+        entry['error'] = f"{type(e).__name__}: {e}"
+    
+    entry['seconds'] = round(time.perf_counter() - started, 4)
+    return df, entry
+
 
 class DataLoader:
     """Service for loading and caching data"""
@@ -11,133 +187,511 @@ class DataLoader:
     _products_cache = None
     _suppliers_cache = None
     _cache_timestamp = None
+    _load_reports = {}
+    _parts = {}  # dataset name -> per-file row ranges and fingerprints
+    _memory_reports = {}
+    _version = 0
+    _dataset_versions = {}  # dataset name -> counter bumped when that frame changes
+    _derived = {}  # indexes and aggregates built from the current frames
+    _materialized = {}  # derived key -> builder run as soon as both datasets are loaded
+    
+    # Bump whenever the cleaning changes so stale snapshots are rebuilt
+    SNAPSHOT_SCHEMA = 3
+    
+    @staticmethod
+    def _snapshot_store():
+        """Snapshot store for cleaned frames, or None when snapshots are disabled"""
+        if not current_app.config.get('USE_DATA_SNAPSHOT', True):
+            return None
+        return SnapshotStore(current_app.config['SNAPSHOT_DIR'],
+                             mmap=current_app.config.get('DATA_SNAPSHOT_MMAP', False))
+    
+    @classmethod
+    def _load_with_snapshot(cls, name, source_files, read_func):
+        """Load a cleaned frame from its snapshot, parsing the CSVs only when it is stale"""
+        started = time.perf_counter()
+        store = cls._snapshot_store()
+        fingerprint = SnapshotStore.fingerprint(source_files, cls.SNAPSHOT_SCHEMA)
+        
+        df, manifest = store.load(name, fingerprint) if store else (None, None)
+        if df is not None:
+            source, files, parts = 'snapshot', [], manifest.get('parts', [])
+            cls._memory_reports[name] = manifest.get('memory')
+        else:
+            source = 'csv'
+            frames, files = read_func(source_files)
+            df, parts = cls._combine(frames, fingerprint)
+            df = cls._compact(name, df)
+            df = cls._save_snapshot(store, name, df, fingerprint, parts)
+        
+        cls._parts[name] = parts
+        cls._record_load(name, source, df, files, started)
+        return df
+    
+    @classmethod
+    def _save_snapshot(cls, store, name, df, fingerprint, parts):
+        """Write df's snapshot; returns the frame to cache (memory-mapped if enabled)"""
+        if store is None or df is None or df.empty:
+            return df
+        try:
+            extra = {'parts': parts, 'memory': cls._memory_reports.get(name)}
+            saved = store.save(name, df, fingerprint, extra=extra)
+        except OSError as e:
+            current_app.logger.warning(f"Could not write {name} snapshot: {e}")
+            return df
+        
+        if saved and store.mmap:
+            # Swap the private frame for the shared, memory-mapped one
+            mapped, _ = store.load(name, fingerprint)
+            if mapped is not None:
+                return mapped
+        return df
     
     @classmethod
-    def load_products(cls, force_reload=False):
-        """Load products from all CSV files in processed folder with caching"""
+    def _record_load(cls, name, source, df, files, started):
+        for entry in files:
+            if entry['error']:
+                current_app.logger.warning(f"Error loading {entry['file']}: {entry['error']}")
+        
+        cls._load_reports[name] = {
+            'source': source,
+            'loaded_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': 0 if df is None else len(df),
+            'seconds': round(time.perf_counter() - started, 4),
+            'files': files,
+            'errors': [entry for entry in files if entry['error']]
+        }
+    
+    @staticmethod
+    def _combine(frames, fingerprint):
+        """Concatenate cleaned per-file frames, recording the rows each file occupies"""
+        if not frames:
+            return None, []
+        
+        file_fingerprints = {source[0]: source[1:] for source in fingerprint['sources']}
+        parts = []
+        start = 0
+        for path, df in frames:
+            filename = os.path.basename(path)
+            parts.append({
+                'file': filename,
+                'fingerprint': file_fingerprints[filename],
+                'start': start,
+                'stop': start + len(df),
+                'columns': list(df.columns),
+                'dtypes': [str(dtype) for dtype in df.dtypes]
+            })
+            start += len(df)
+        
+        return pd.concat([df for _, df in frames], ignore_index=True), parts
+    
+    @staticmethod
+    def _part_frame(df, part):
+        """Cut one file's cleaned sub-frame back out of a combined frame"""
+        columns = [column for column in part['columns'] if column in df.columns]
+        sub = df.iloc[part['start']:part['stop']][columns]
+        dtypes = {
+            column: dtype for column, dtype in zip(part['columns'], part['dtypes'])
+            if column in sub.columns and str(sub[column].dtype) != dtype
+        }
+        return sub.astype(dtypes) if dtypes else sub
+    
+    @classmethod
+    def _compact(cls, name, df):
+        """Apply the dataset's compact dtypes and remember the memory saved"""
+        if df is None:
+            return None
+        df, cls._memory_reports[name] = compact_frame(df, **COMPACT_COLUMNS[name])
+        return df
+    
+    @staticmethod
+    def _product_sources():
+        """List the product CSV files to load"""
+        processed_dir = current_app.config['PROCESSED_DIR']
+        
+        # Find all CSV files in processed folder (sorted so row order is stable)
+        csv_files = sorted(glob.glob(os.path.join(processed_dir, '*.csv')))
+        
+        if not csv_files:
+            # Fallback to old single CSV if no files in processed folder
+            csv_path = current_app.config['PRODUCT_CSV']
+            if os.path.exists(csv_path):
+                csv_files = [csv_path]
+        
+        return csv_files
+    
+    @classmethod
+    def load_products(cls, force_reload=False, copy=True):
+        """Load products from all CSV files in processed folder with caching
+        
+        With copy=False a read-only view of the cached frame is returned
+        instead of a full copy. It shares memory with the cache; any write
+        (e.g. adding a column or df.assign) copies only what it touches.
+        """
         if cls._products_cache is None or force_reload:
-            processed_dir = current_app.config['PROCESSED_DIR']
-            
-            # Find all CSV files in processed folder
-            csv_files = glob.glob(os.path.join(processed_dir, '*.csv'))
-            
+            csv_files = cls._product_sources()
             if not csv_files:
-                # Fallback to old single CSV if no files in processed folder
-                csv_path = current_app.config['PRODUCT_CSV']
-                if os.path.exists(csv_path):
-                    csv_files = [csv_path]
-                else:
-                    # Return empty dataframe if no data files found
-                    return pd.DataFrame()
-            
-            all_products = []
-            
-            # Load each CSV and extract category from filename
-            for csv_file in csv_files:
-                try:
-                    df = pd.read_csv(csv_file, encoding='utf-8-sig')
-                    
-                    # Strip whitespace from column names (handles invisible chars on Linux)
-                    df.columns = df.columns.str.strip()
-                    
-                    # Extract category from filename (e.g., "Car and Automobiles - P C.csv" -> "Car and Automobiles")
-                    filename = os.path.basename(csv_file)
-                    category = filename.replace(' - P C.csv', '').replace('.csv', '')
-                    
-                    # Add category column
-                    df['Category'] = category
-                    
-                    all_products.append(df)
-                except Exception as e:
-                    print(f"Error loading {csv_file}: {e}")
-                    continue
-            
-            if not all_products:
+                # Return empty dataframe if no data files found
                 return pd.DataFrame()
             
-            # Combine all dataframes
-            df = pd.concat(all_products, ignore_index=True)
-            
-            # Clean and process data
-            # Normalize column names one more time after concat (defensive)
-            df.columns = df.columns.str.strip()
-            
-            # Handle text fields - convert to string and fill NaN
-            # Use case-insensitive column lookup to handle any encoding variation
-            title_col = next((c for c in df.columns if c.lower().strip() == 'title'), 'Title')
-            image_col = next((c for c in df.columns if c.lower().strip() == 'image'), 'Image')
-            df['Title'] = df[title_col].fillna('').astype(str).str.strip()
-            df['Title'] = df['Title'].replace('', 'Unknown Product')  # only truly empty titles
-            df['Image'] = df[image_col].fillna('').astype(str)
-            
-            # Clean price
-            df['Price'] = df['Price'].astype(str).str.replace(',', '').str.replace('₹', '').str.strip().astype(float)
-            
-            # Clean ratings
-            df['Ratings'] = df['Ratings'].astype(str).str.extract(r'(\d+\.?\d*)').fillna(0).astype(float)
-            
-            # Clean reviews
-            df['Review'] = df['Review'].astype(str).str.replace(',', '').str.extract(r'(\d+)').fillna(0).astype(int)
-            
-            # Clean monthly sales
-            df['Monthly Sales'] = df['Monthly Sales'].fillna('0').astype(str)
-            
-            # Extract sales number
-            df['Sales_Number'] = df['Monthly Sales'].str.extract(r'(\d+)').fillna(0).astype(int)
-            
-            # Use Product Identified as Product Identifier (fix typo in CSV)
-            if 'Product Identified' in df.columns and 'Product Identifier' not in df.columns:
-                df['Product Identifier'] = df['Product Identified'].fillna('Unknown').astype(str)
-            elif 'Product Identifier' in df.columns:
-                df['Product Identifier'] = df['Product Identifier'].fillna('Unknown').astype(str)
-            else:
-                # Create Product Identifier from Title if neither exists
-                df['Product Identifier'] = df['Title'].str[:50]
+            df = cls._load_with_snapshot('products', csv_files, cls._read_products)
+            if df is None:
+                return pd.DataFrame()
             
             cls._products_cache = df
             cls._cache_timestamp = datetime.now()
+            cls._bump_version('products')
+            cls._link_datasets()
+        
+        return cls._products_cache.copy(deep=copy)
+    
+    @staticmethod
+    def _read_products(csv_files):
+        """Parse and clean product CSV files, in parallel when DATA_LOAD_WORKERS > 1"""
+        workers = min(current_app.config.get('DATA_LOAD_WORKERS', 0), len(csv_files))
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_product_file, csv_files))
+        else:
+            results = [read_product_file(csv_file) for csv_file in csv_files]
         
-        return cls._products_cache.copy()
+        files = [entry for _, entry in results]
+        frames = [(csv_file, df) for csv_file, (df, _) in zip(csv_files, results) if df is not None]
+        return frames, files
     
     @classmethod
-    def load_suppliers(cls, force_reload=False):
-        """Load suppliers from CSV with caching"""
+    def load_suppliers(cls, force_reload=False, copy=True):
+        """Load suppliers from CSV with caching (copy=False returns a read-only view)"""
         if cls._suppliers_cache is None or force_reload:
             csv_path = current_app.config['SUPPLIER_CSV']
-            df = pd.read_csv(csv_path, encoding='utf-8-sig')
-            df.columns = df.columns.str.strip()
-            
-            # Clean and process data
-            df['Price'] = df['Price'].fillna('₹ 0').astype(str).str.replace('₹', '').str.replace(',', '').str.split('/').str[0].astype(float)
-            df['Rating'] = df['Rating'].fillna(0).astype(float)
-            df['Reviews'] = df['Reviews'].fillna(0).astype(int)
-            
-            # Add supplier rank
-            df['Supplier_Rank'] = df.groupby('Product Searched')['Supplier Round'].rank(method='dense')
+            df = cls._load_with_snapshot('suppliers', [csv_path], cls._read_suppliers)
             
             cls._suppliers_cache = df
             cls._cache_timestamp = datetime.now()
+            cls._bump_version('suppliers')
+            cls._link_datasets()
+        
+        return cls._suppliers_cache.copy(deep=copy)
+    
+    @staticmethod
+    def _read_suppliers(csv_files):
+        """Parse and clean the supplier CSV, in chunks when SUPPLIER_CHUNK_SIZE is set"""
+        started = time.perf_counter()
+        chunk_size = current_app.config.get('SUPPLIER_CHUNK_SIZE', 0)
+        if chunk_size > 0:
+            df = read_supplier_chunks(csv_files[0], chunk_size)
+        else:
+            df = pd.read_csv(csv_files[0], encoding='utf-8-sig')
+            df = clean_suppliers(df)
+        
+        # Add supplier rank
+        df['Supplier_Rank'] = df.groupby('Product Searched')['Supplier Round'].rank(method='dense')
+        
+        entry = {
+            'file': os.path.basename(csv_files[0]),
+            'rows': len(df),
+            'seconds': round(time.perf_counter() - started, 4),
+            'error': None
+        }
+        return [(csv_files[0], df)], [entry]
+    
+    @classmethod
+    def refresh(cls):
+        """Reload only the source files added, changed or removed since the last load
+        
+        Returns which files were reloaded and how long each one took.
+        """
+        return {
+            'products': cls._refresh_products(),
+            'suppliers': cls._refresh_suppliers()
+        }
+    
+    @classmethod
+    def _refresh_products(cls):
+        started = time.perf_counter()
+        csv_files = cls._product_sources()
+        parts = cls._parts.get('products')
+        
+        if cls._products_cache is None or not parts:
+            cls.load_products(force_reload=True)
+            return cls._full_refresh_report('products', started)
+        
+        fingerprint = SnapshotStore.fingerprint(csv_files, cls.SNAPSHOT_SCHEMA)
+        current = {os.path.basename(path): path for path in csv_files}
+        file_fingerprints = {source[0]: source[1:] for source in fingerprint['sources']}
+        known = {part['file']: part for part in parts}
+        
+        changed = [name for name in current if name in known and known[name]['fingerprint'] != file_fingerprints[name]]
+        added = [name for name in current if name not in known]
+        removed = [name for name in known if name not in current]
+        unchanged = [name for name in current if name in known and name not in changed]
+        
+        if not (changed or added or removed):
+            return {'mode': 'incremental', 'reloaded': [], 'unchanged': unchanged,
+                    'seconds': round(time.perf_counter() - started, 4)}
+        
+        # Parse only the new and modified files, then splice them between the untouched ones
+        frames, files = cls._read_products([current[name] for name in sorted(changed + added)])
+        fresh = {os.path.basename(path): df for path, df in frames}
+        old = cls._products_cache
+        pieces = []
+        for name in sorted(current):
+            if name in fresh:
+                pieces.append((current[name], fresh[name]))
+            elif name in unchanged:
+                pieces.append((current[name], cls._part_frame(old, known[name])))
+        
+        df, new_parts = cls._combine(pieces, fingerprint)
+        df = cls._compact('products', df)
+        df = cls._save_snapshot(cls._snapshot_store(), 'products', df, fingerprint, new_parts)
+        cls._products_cache = df
+        cls._parts['products'] = new_parts
+        cls._cache_timestamp = datetime.now()
+        cls._bump_version('products')
+        cls._link_datasets()
+        cls._record_load('products', 'refresh', df, files, started)
+        
+        reloaded = [dict(entry, status='changed' if entry['file'] in changed else 'added') for entry in files]
+        for name in removed:
+            part = known[name]
+            reloaded.append({'file': name, 'status': 'removed', 'rows': part['stop'] - part['start'],
+                             'seconds': 0.0, 'error': None})
+        
+        return {'mode': 'incremental', 'reloaded': reloaded, 'unchanged': unchanged,
+                'seconds': round(time.perf_counter() - started, 4)}
+    
+    @classmethod
+    def _refresh_suppliers(cls):
+        started = time.perf_counter()
+        csv_path = current_app.config['SUPPLIER_CSV']
+        parts = cls._parts.get('suppliers')
+        
+        if cls._suppliers_cache is not None and parts and parts[0]['fingerprint'] == SnapshotStore.file_fingerprint(csv_path):
+            return {'mode': 'incremental', 'reloaded': [], 'unchanged': [parts[0]['file']],
+                    'seconds': round(time.perf_counter() - started, 4)}
+        
+        cls.load_suppliers(force_reload=True)
+        return cls._full_refresh_report('suppliers', started)
+    
+    @classmethod
+    def _full_refresh_report(cls, name, started):
+        report = cls._load_reports.get(name, {})
+        reloaded = [dict(entry, status='loaded') for entry in report.get('files', [])]
+        return {'mode': 'full', 'source': report.get('source'), 'reloaded': reloaded, 'unchanged': [],
+                'seconds': round(time.perf_counter() - started, 4)}
+    
+    @classmethod
+    def get_load_report(cls):
+        """Get the report of the last product and supplier loads"""
+        return dict(cls._load_reports)
+    
+    @classmethod
+    def get_memory_report(cls):
+        """Get bytes per column before and after compaction for each loaded dataset"""
+        return {name: report for name, report in cls._memory_reports.items() if report}
+    
+    @classmethod
+    def _bump_version(cls, *names):
+        """Invalidate everything derived from the previous frames after the named datasets changed"""
+        cls._version += 1
+        for name in names:
+            cls._dataset_versions[name] = cls._dataset_versions.get(name, 0) + 1
+        cls._derived = {}
+    
+    @classmethod
+    def get_parts(cls, name):
+        """Source file, fingerprint and row range of each file in the cached 'products' or 'suppliers' frame"""
+        return list(cls._parts.get(name) or [])
+    
+    @classmethod
+    def get_dataset_version(cls, name=None):
+        """Counter that changes whenever the cached products or suppliers change
+        
+        With a name ('products' or 'suppliers') only changes of that dataset count.
+        """
+        if name is None:
+            return cls._version
+        return cls._dataset_versions.get(name, 0)
+    
+    @classmethod
+    def derived(cls, key, build):
+        """Get a structure computed from the cached frames, built once per dataset version"""
+        value = cls._derived.get(key)
+        if value is None:
+            version = cls._version
+            value = build()
+            # Don't keep it if a reload happened while it was being built
+            if version == cls._version:
+                cls._derived[key] = value
+        return value
+    
+    @classmethod
+    def _product_positions(cls):
+        """Index: product identifier -> row position of its first occurrence"""
+        def build():
+            identifiers = cls.load_products(copy=False)['Product Identifier']
+            first = identifiers.drop_duplicates()
+            return dict(zip(first.tolist(), first.index.tolist()))
+        return cls.derived('product_positions', build)
+    
+    @classmethod
+    def _supplier_positions(cls):
+        """Index: searched product -> row positions of its suppliers"""
+        def build():
+            suppliers = cls.load_suppliers(copy=False)
+            return suppliers.groupby('Product Searched', observed=True, sort=False).indices
+        return cls.derived('supplier_positions', build)
+    
+    @classmethod
+    def _frame(cls, dataset):
+        if dataset == 'products':
+            return cls.load_products(copy=False)
+        return cls.load_suppliers(copy=False)
+    
+    @classmethod
+    def get_token_index(cls, dataset, column):
+        """Inverted token index over a text column of 'products' or 'suppliers'"""
+        def build():
+            return TokenIndex(cls._frame(dataset)[column])
+        return cls.derived(('tokens', dataset, column), build)
+    
+    @classmethod
+    def get_trigram_index(cls, dataset, column):
+        """Trigram index over a text column of 'products' or 'suppliers' for fuzzy search"""
+        def build():
+            return TrigramIndex(cls._frame(dataset)[column])
+        return cls.derived(('trigrams', dataset, column), build)
+    
+    @classmethod
+    def get_sorted_index(cls, dataset, column):
+        """Sorted permutation index over a numeric column of 'products' or 'suppliers'"""
+        def build():
+            return SortedIndex(cls._frame(dataset)[column])
+        return cls.derived(('sorted', dataset, column), build)
+    
+    @classmethod
+    def get_bitmap_index(cls, dataset, column):
+        """Per-value bitmaps over a low-cardinality column of 'products' or 'suppliers'"""
+        def build():
+            return BitmapIndex(cls._frame(dataset)[column])
+        return cls.derived(('bitmap', dataset, column), build)
+    
+    @classmethod
+    def _link_datasets(cls):
+        """Build the product<->supplier join and the materialized aggregates as soon as both frames are loaded"""
+        if cls._products_cache is not None and cls._suppliers_cache is not None:
+            cls.get_supplier_links()
+            for key, build in cls._materialized.items():
+                cls.derived(key, build)
+    
+    @classmethod
+    def materialize(cls, key, build):
+        """Register a derived structure to be built eagerly on every load instead of on first use"""
+        cls._materialized[key] = build
+    
+    @classmethod
+    def get_supplier_links(cls):
+        """Join suppliers to products once per dataset version
+        
+        Suppliers reference products by matching 'Product Searched' against
+        'Product Identifier'. The result holds, aligned with the supplier rows,
+        the row position of the matched product ('product_row', -1 if none) and
+        its 'category', plus reverse adjacency lists:
+        
+        - 'product_suppliers': product row -> supplier row positions
+        - 'category_suppliers': category -> supplier row positions (an identifier
+          listed under several categories links its suppliers to each of them)
+        - 'category_weights': product row -> number of product rows per category
+          for that identifier, used to count categories without the product frame
+        """
+        def build():
+            products = cls.load_products(copy=False)
+            suppliers = cls.load_suppliers(copy=False)
+            positions = cls._product_positions() if not products.empty else {}
+            
+            codes, uniques = pd.factorize(suppliers['Product Searched'])
+            lookup = np.array([positions.get(value, -1) for value in uniques] + [-1], dtype=np.int32)
+            product_row = lookup[codes]  # code -1 (missing) hits the trailing -1
+            matched = product_row >= 0
+            
+            if products.empty:
+                categories = pd.Categorical([None] * len(suppliers))
+                weights = pd.DataFrame(dtype='int64')
+            else:
+                category = products['Category']
+                categories = pd.Categorical(category.to_numpy()[np.where(matched, product_row, 0)])
+                categories[~matched] = np.nan
+                key = products['Product Identifier'].map(positions)
+                weights = pd.crosstab(key, category)
+            
+            rows = np.flatnonzero(matched)
+            product_suppliers = pd.Series(rows).groupby(product_row[rows]).indices
+            product_suppliers = {int(r): rows[idx] for r, idx in product_suppliers.items()}
+            
+            category_suppliers = {}
+            for name in weights.columns:
+                linked = weights.index[weights[name].to_numpy() > 0].to_numpy()
+                if len(linked):
+                    category_suppliers[name] = np.flatnonzero(np.isin(product_row, linked))
+            
+            return {
+                'product_row': product_row,
+                'category': categories,
+                'product_suppliers': product_suppliers,
+                'category_suppliers': category_suppliers,
+                'category_weights': weights
+            }
+        return cls.derived('supplier_links', build)
+    
+    @classmethod
+    def get_supplier_category_counts(cls, suppliers):
+        """Count product rows per category over the products a set of supplier rows supply"""
+        links = cls.get_supplier_links()
+        product_row = links['product_row'][suppliers.index.to_numpy()]
+        linked = np.unique(product_row[product_row >= 0])
+        counts = links['category_weights'].loc[linked].sum()
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+    
+    @classmethod
+    def get_product_with_suppliers(cls, identifier):
+        """Get a product and its suppliers through the precomputed join"""
+        df = cls.load_products(copy=False)
+        position = cls._product_positions().get(identifier) if not df.empty else None
+        if position is None:
+            return None, cls.load_suppliers(copy=False).iloc[:0]
         
-        return cls._suppliers_cache.copy()
+        suppliers = cls.load_suppliers(copy=False)
+        rows = cls.get_supplier_links()['product_suppliers'].get(position)
+        if rows is None:
+            return df.iloc[position].to_dict(), suppliers.iloc[:0]
+        return df.iloc[position].to_dict(), suppliers.take(rows)
     
     @classmethod
     def get_product_by_identifier(cls, identifier):
         """Get single product by identifier"""
-        df = cls.load_products()
-        product = df[df['Product Identifier'] == identifier]
-        if not product.empty:
-            return product.iloc[0].to_dict()
+        df = cls.load_products(copy=False)
+        if df.empty:
+            return None
+        position = cls._product_positions().get(identifier)
+        if position is not None:
+            return df.iloc[position].to_dict()
         return None
     
     @classmethod
     def get_suppliers_for_product(cls, product_identifier):
         """Get all suppliers for a specific product"""
-        df = cls.load_suppliers()
-        return df[df['Product Searched'] == product_identifier].copy()
+        df = cls.load_suppliers(copy=False)
+        positions = cls._supplier_positions().get(product_identifier)
+        if positions is None:
+            return df.iloc[:0]
+        return df.take(positions)
     
     @classmethod
     def clear_cache(cls):
         """Clear all cached data"""
         cls._products_cache = None
         cls._suppliers_cache = None
-        cls._cache_timestamp = None
\ No newline at end of file
+        cls._cache_timestamp = None
+        cls._parts = {}
+        cls._bump_version('products', 'suppliers')
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from app.services.data_loader import DataLoader
+from app.services.filter_engine import FilterEngine
+from app.utils.constants import PRICE_RANGES, RATING_CATEGORIES
+
+
+class Facets:
+    """Per-value result counts for the filter sidebar
+    
+    Every facet value of every row is stored once per dataset version as a
+    (row, code) pair, grouped by facet. Each facet is counted over the rows
+    matching every filter except its own (disjunctive faceting), so picking
+    a category still shows how many results the other categories would
+    give; that is one bincount over the facet's pairs per facet.
+    """
+    
+    @staticmethod
+    def _bucket_codes(values, ranges):
+        """Bucket number of each value in a {name: (low, high)} dict, -1 when outside every bucket
+        
+        Buckets hold low <= value < high; the top bucket also holds its upper bound.
+        """
+        names = sorted(ranges, key=lambda name: ranges[name][0])
+        lows = np.array([ranges[name][0] for name in names], dtype=float)
+        highs = np.array([ranges[name][1] for name in names], dtype=float)
+        values = np.asarray(values, dtype=float)
+        
+        codes = np.searchsorted(lows, values, side='right') - 1
+        inside = (codes >= 0) & ((values < highs[codes]) | ((codes == len(names) - 1) & (values == highs[-1])))
+        return names, np.where(inside, codes, -1)
+    
+    @staticmethod
+    def _value_codes(series):
+        """Codes of a text column by label (labels sorted)"""
+        codes, uniques = pd.factorize(series, sort=True)
+        return [str(label) for label in uniques], codes
+    
+    @staticmethod
+    def _build(dataset):
+        """(facet name, labels, offset, pair start, pair stop) list plus the flattened row/code pairs"""
+        df = DataLoader.load_products(copy=False) if dataset == 'products' else DataLoader.load_suppliers(copy=False)
+        size = len(df)
+        rows = np.arange(size)
+        
+        facets = []
+        if dataset == 'products':
+            facets.append(('category', *Facets._value_codes(df['Category']), rows))
+            facets.append(('price', *Facets._bucket_codes(df['Price'], PRICE_RANGES), rows))
+            facets.append(('rating', *Facets._bucket_codes(df['Ratings'], RATING_CATEGORIES), rows))
+        else:
+            # A supplier can count under several categories (see get_supplier_links)
+            linked = DataLoader.get_supplier_links()['category_suppliers']
+            labels = sorted(linked)
+            category_rows = np.concatenate([linked[label] for label in labels]) if labels else np.empty(0, dtype=np.int64)
+            category_codes = np.repeat(np.arange(len(labels)), [len(linked[label]) for label in labels])
+            facets.append(('category', labels, category_codes, category_rows))
+            facets.append(('location', *Facets._value_codes(df['Location']), rows))
+            facets.append(('price', *Facets._bucket_codes(df['Price'], PRICE_RANGES), rows))
+            facets.append(('rating', *Facets._bucket_codes(df['Rating'], RATING_CATEGORIES), rows))
+        
+        layout, pair_rows, pair_codes = [], [], []
+        offset = start = 0
+        for name, labels, codes, facet_rows in facets:
+            valid = codes >= 0
+            stop = start + int(valid.sum())
+            layout.append((name, labels, offset, start, stop))
+            pair_rows.append(facet_rows[valid])
+            pair_codes.append(codes[valid] + offset)
+            offset += len(labels)
+            start = stop
+        
+        pair_rows = np.concatenate(pair_rows).astype(np.int32)
+        pair_codes = np.concatenate(pair_codes).astype(np.int32)
+        return {
+            'size': size,
+            'layout': layout,
+            'pair_rows': pair_rows,
+            'pair_codes': pair_codes,
+            'totals': np.bincount(pair_codes, minlength=offset)
+        }
+    
+    @staticmethod
+    def counts(dataset, predicates=None):
+        """Result counts per facet value under the active filters
+        
+        predicates maps a facet name to the RowSet of its filter (as from
+        Filters.product_predicates); keys that are not facets, such as
+        'search', apply to every facet. Returns {'total': rows matching every
+        filter, 'facets': {facet: [{'value', 'count'}, ...]}} with every value
+        listed, including those with no matching rows.
+        """
+        index = DataLoader.derived(('facets', dataset), lambda: Facets._build(dataset))
+        predicates = predicates or {}
+        masks = {}
+        
+        def selected(excluded):
+            """Boolean mask of the rows matching every predicate but excluded (None for every row)"""
+            key = excluded if excluded in predicates else None
+            if key not in masks:
+                rows = FilterEngine.all_of([rowset for name, rowset in predicates.items() if name != key])
+                masks[key] = None if rows is None else np.unpackbits(rows.bits, count=rows.size).astype(bool)
+            return masks[key]
+        
+        facets = {}
+        for name, labels, offset, start, stop in index['layout']:
+            mask = selected(name)
+            if mask is None:
+                counts = index['totals'][offset:offset + len(labels)]
+            else:
+                codes = index['pair_codes'][start:stop][mask[index['pair_rows'][start:stop]]]
+                counts = np.bincount(codes - offset, minlength=len(labels))
+            facets[name] = [{'value': label, 'count': int(counts[i])} for i, label in enumerate(labels)]
+        
+        mask = selected(None)
+        return {
+            'total': index['size'] if mask is None else int(mask.sum()),
+            'facets': facets
+        }
@@ -0,0 +1,59 @@
+from app.services.data_loader import DataLoader
+from app.services.indexes import RowSet
+
+
+class FilterEngine:
+    """Evaluates filter predicates on one dataset as bitmaps over its rows
+    
+    Each predicate is answered from an index built once per dataset version
+    (sorted indexes for ranges, per-value bitmaps for Category/Location) and
+    predicates are combined with bitwise AND/OR, so no rows are touched until
+    the final set of row ids is taken.
+    """
+    
+    def __init__(self, dataset):
+        self.dataset = dataset
+        frame = DataLoader.load_products(copy=False) if dataset == 'products' else DataLoader.load_suppliers(copy=False)
+        self.size = len(frame)
+    
+    def range(self, column, low=None, high=None):
+        """Rows with low <= column <= high"""
+        index = DataLoader.get_sorted_index(self.dataset, column)
+        rows = index.range(None if low is None else float(low), None if high is None else float(high))
+        return RowSet.from_rows(rows, self.size)
+    
+    def value(self, column, value, match='exact'):
+        """Rows whose column equals value (case-insensitive)
+        
+        match='contains' keeps the older substring/regex matching; it tests
+        every distinct value and is slower.
+        """
+        index = DataLoader.get_bitmap_index(self.dataset, column)
+        if match == 'contains':
+            return index.contains(value)
+        return index.equals(value)
+    
+    def rows(self, rows):
+        """Rows from an explicit list of row ids (search hits, join results)"""
+        return RowSet.from_rows(rows, self.size)
+    
+    @staticmethod
+    def all_of(predicates):
+        """AND of the predicates, or None when there are none"""
+        result = None
+        for predicate in predicates:
+            result = predicate if result is None else result & predicate
+        return result
+    
+    @staticmethod
+    def any_of(predicates):
+        """OR of the predicates, or None when there are none"""
+        result = None
+        for predicate in predicates:
+            result = predicate if result is None else result | predicate
+        return result
+    
+    def select(self, predicates):
+        """Sorted row ids matching every predicate, or None to keep every row"""
+        result = self.all_of(predicates)
+        return None if result is None else result.rows()
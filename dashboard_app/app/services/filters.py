@@ -1,77 +1,281 @@
+import hashlib
+import json
 import pandas as pd
+import numpy as np
+from flask import current_app
 from app.services.data_loader import DataLoader
+from app.services.indexes import PrefixIndex, tokenize
+from app.services.filter_engine import FilterEngine
+from app.services.result_cache import ResultCache
+from app.utils.constants import (FUZZY_MIN_SIMILARITY, FUZZY_LONG_MIN_SIMILARITY, FUZZY_LONG_VALUE_RATIO,
+                                 DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+from app.utils.helpers import create_pagination
 
 class Filters:
     """Service for filtering data based on user selections"""
     
+    _results = None  # row ids of recent filter combinations (see _cached_rows)
+    
+    @staticmethod
+    def _result_cache():
+        if Filters._results is None:
+            Filters._results = ResultCache(current_app.config.get('FILTER_CACHE_SIZE', 256))
+        return Filters._results
+    
+    @staticmethod
+    def get_cache_stats():
+        """Hit/miss counters of the filter result cache"""
+        return Filters._result_cache().stats()
+    
+    @staticmethod
+    def _filter_key(dataset, price_min, price_max, rating_min, value, category, search_term, match):
+        """Normalized cache key: equivalent filter combinations share one entry
+        
+        Rows are computed from the key's own values (see _key_filters), so
+        every request that maps to an entry gets the rows it describes.
+        """
+        def number(x):
+            return None if x is None else float(x)
+        
+        def text(x):
+            if not x or x == 'all':
+                return None
+            return x if match == 'contains' else str(x).strip().lower()
+        
+        search = tuple(sorted(set(tokenize(search_term)))) if search_term else None
+        match = 'contains' if match == 'contains' and (value or category) else 'exact'
+        return (dataset, number(price_min), number(price_max), number(rating_min),
+                text(value), text(category), search, match)
+    
+    @staticmethod
+    def _key_filters(key):
+        """Filter arguments rebuilt from a cache key (value is the location for suppliers)"""
+        _, price_min, price_max, rating_min, value, category, search, match = key
+        return price_min, price_max, rating_min, value, category, ' '.join(search) if search else None, match
+    
+    @staticmethod
+    def _cached_rows(key, compute):
+        """Row ids for a filter key, computed once per dataset version"""
+        cache = Filters._result_cache()
+        version = DataLoader.get_dataset_version()
+        rows = cache.get(key, version)
+        if rows is None:
+            rows = compute()
+            if rows is not None:
+                rows.setflags(write=False)
+            cache.put(key, version, rows)
+        return rows
+    
+    @staticmethod
+    def search_rows(dataset, columns, query):
+        """Row ids where any of the columns contains every token of query (as word prefixes)
+        
+        Uses the inverted token indexes built once per dataset version.
+        """
+        rows = [DataLoader.get_token_index(dataset, column).search(query) for column in columns]
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int32)
+    
+    @staticmethod
+    def fuzzy_rows(dataset, column, query, scores, limit=None):
+        """Row ids whose column is similar to query (misspellings, joined or hyphenated words)
+        
+        Ranked by trigram similarity, then by trigram Jaccard (closest in
+        length), then by scores; candidates come from the trigram index built
+        once per dataset version.
+        """
+        index = DataLoader.get_trigram_index(dataset, column)
+        rows, similarity, jaccard = index.search(query, FUZZY_MIN_SIMILARITY, FUZZY_LONG_MIN_SIMILARITY, FUZZY_LONG_VALUE_RATIO)
+        if len(rows) == 0:
+            return rows
+        values = np.nan_to_num(np.asarray(scores, dtype=float)[rows], nan=-np.inf)
+        order = np.lexsort((-values, -jaccard, -similarity))
+        if limit is not None:
+            order = order[:limit]
+        return rows[order]
+    
+    @staticmethod
+    def typeahead(query):
+        """Best product and supplier completions for a partially typed query"""
+        index = DataLoader.derived('typeahead', Filters._build_typeahead)
+        return {
+            'products': [index['products'][i] for i in index['product_index'].complete(query)],
+            'suppliers': [index['suppliers'][i] for i in index['supplier_index'].complete(query)]
+        }
+    
+    @staticmethod
+    def _build_typeahead():
+        """Prefix indexes over product titles/identifiers and supplier names, with their payloads"""
+        products = DataLoader.load_products(copy=False)
+        suppliers = DataLoader.load_suppliers(copy=False)
+        
+        # Products: one entry per row, found by title or identifier, most reviewed first
+        rows = np.arange(len(products))
+        product_index = PrefixIndex(
+            np.concatenate([rows, rows]),
+            products['Title'].tolist() + products['Product Identifier'].tolist(),
+            products['Review'].to_numpy()
+        )
+        product_payload = products[['Product Identifier', 'Title', 'Price', 'Ratings', 'Image']]
+        product_payload = product_payload.replace({np.nan: None}).to_dict('records')
+        
+        # Suppliers: one entry per name, shown with its most reviewed listing
+        best = suppliers.sort_values('Reviews', ascending=False, kind='stable').drop_duplicates('Supplier Name')
+        supplier_index = PrefixIndex(np.arange(len(best)), best['Supplier Name'].tolist(), best['Reviews'].to_numpy())
+        supplier_payload = best[['Supplier Name', 'Location', 'Rating', 'Price']]
+        supplier_payload = supplier_payload.astype(object).replace({np.nan: None}).to_dict('records')
+        
+        return {
+            'product_index': product_index,
+            'products': product_payload,
+            'supplier_index': supplier_index,
+            'suppliers': supplier_payload
+        }
+    
     @staticmethod
     def filter_products(price_min=None, price_max=None, rating_min=None, 
-                       category=None, search_term=None):
-        """Filter products based on multiple criteria"""
-        df = DataLoader.load_products()
+                       category=None, search_term=None, match='exact'):
+        """Filter products based on multiple criteria
+        
+        category matches whole values; match='contains' opts into the slower
+        substring matching.
+        """
+        df = DataLoader.load_products(copy=False)
+        rows = Filters.filter_product_rows(price_min, price_max, rating_min, category, search_term, match)
+        return df if rows is None else df.take(rows)
+    
+    @staticmethod
+    def filter_product_rows(price_min=None, price_max=None, rating_min=None,
+                            category=None, search_term=None, match='exact'):
+        """Sorted row ids of the products matching the filters (None when unfiltered)"""
+        DataLoader.load_products(copy=False)
+        key = Filters._filter_key('products', price_min, price_max, rating_min, None, category, search_term, match)
+        if all(part is None for part in key[1:-1]):  # no filters
+            return None
+        
+        price_min, price_max, rating_min, _, category, search_term, match = Filters._key_filters(key)
+        return Filters._cached_rows(key, lambda: Filters._product_rows(
+            price_min, price_max, rating_min, category, search_term, match))
+    
+    @staticmethod
+    def _product_rows(price_min, price_max, rating_min, category, search_term, match):
+        predicates = Filters.product_predicates(price_min, price_max, rating_min, category, search_term, match)
+        return FilterEngine('products').select(list(predicates.values()))
+    
+    @staticmethod
+    def product_predicates(price_min=None, price_max=None, rating_min=None,
+                           category=None, search_term=None, match='exact'):
+        """Bitmap of the products passing each active filter, keyed by the facet it narrows
         
-        # Apply filters
-        if price_min is not None:
-            df = df[df['Price'] >= float(price_min)]
+        Keys are 'price', 'rating', 'category' and 'search'; filters that are
+        not set are left out.
+        """
+        engine = FilterEngine('products')
         
-        if price_max is not None:
-            df = df[df['Price'] <= float(price_max)]
+        # Each predicate is a bitmap; rows are only taken once, at the end
+        predicates = {}
+        if price_min is not None or price_max is not None:
+            predicates['price'] = engine.range('Price', price_min, price_max)
         
         if rating_min is not None:
-            df = df[df['Ratings'] >= float(rating_min)]
+            predicates['rating'] = engine.range('Ratings', rating_min)
         
         if category and category != 'all':
-            df = df[df['Category'].str.contains(category, case=False, na=False)]
+            predicates['category'] = engine.value('Category', category, match)
         
         if search_term:
-            df = df[df['Title'].str.contains(search_term, case=False, na=False) | 
-                   df['Product Identifier'].str.contains(search_term, case=False, na=False)]
+            predicates['search'] = engine.rows(Filters.search_rows('products', ['Title', 'Product Identifier'], search_term))
         
-        return df
+        return predicates
     
     @staticmethod
     def filter_suppliers(price_min=None, price_max=None, rating_min=None,
-                        location=None, category=None, search_term=None):
-        """Filter suppliers based on multiple criteria"""
-        df = DataLoader.load_suppliers()
-        products = DataLoader.load_products()
+                        location=None, category=None, search_term=None, match='exact'):
+        """Filter suppliers based on multiple criteria
         
-        # Apply filters
-        if price_min is not None:
-            df = df[df['Price'] >= float(price_min)]
+        location matches whole values; match='contains' opts into the slower
+        substring matching.
+        """
+        df = DataLoader.load_suppliers(copy=False)
+        rows = Filters.filter_supplier_rows(price_min, price_max, rating_min, location, category, search_term, match)
+        return df if rows is None else df.take(rows)
+    
+    @staticmethod
+    def filter_supplier_rows(price_min=None, price_max=None, rating_min=None,
+                             location=None, category=None, search_term=None, match='exact'):
+        """Sorted row ids of the suppliers matching the filters (None when unfiltered)"""
+        DataLoader.load_suppliers(copy=False)
+        key = Filters._filter_key('suppliers', price_min, price_max, rating_min, location, category, search_term, match)
+        if all(part is None for part in key[1:-1]):  # no filters
+            return None
         
-        if price_max is not None:
-            df = df[df['Price'] <= float(price_max)]
+        price_min, price_max, rating_min, location, category, search_term, match = Filters._key_filters(key)
+        return Filters._cached_rows(key, lambda: Filters._supplier_rows(
+            price_min, price_max, rating_min, location, category, search_term, match))
+    
+    @staticmethod
+    def _supplier_rows(price_min, price_max, rating_min, location, category, search_term, match):
+        predicates = Filters.supplier_predicates(price_min, price_max, rating_min, location, category, search_term, match)
+        return FilterEngine('suppliers').select(list(predicates.values()))
+    
+    @staticmethod
+    def supplier_predicates(price_min=None, price_max=None, rating_min=None,
+                            location=None, category=None, search_term=None, match='exact'):
+        """Bitmap of the suppliers passing each active filter, keyed by the facet it narrows
+        
+        Keys are 'price', 'rating', 'location', 'category' and 'search';
+        filters that are not set are left out.
+        """
+        engine = FilterEngine('suppliers')
+        
+        predicates = {}
+        if price_min is not None or price_max is not None:
+            predicates['price'] = engine.range('Price', price_min, price_max)
         
         if rating_min is not None:
-            df = df[df['Rating'] >= float(rating_min)]
+            predicates['rating'] = engine.range('Rating', rating_min)
         
         if location and location != 'all':
-            df = df[df['Location'].str.contains(location, case=False, na=False)]
+            predicates['location'] = engine.value('Location', location, match)
         
         if category and category != 'all':
-            # Filter suppliers by the category of products they supply
-            category_products = products[products['Category'] == category]['Product Identifier'].unique()
-            df = df[df['Product Searched'].isin(category_products)]
+            # Filter suppliers by the category of products they supply (joined at load)
+            linked = DataLoader.get_supplier_links()['category_suppliers']
+            name = category.strip().lower()
+            predicates['category'] = (engine.any_of([engine.rows(rows) for label, rows in linked.items() if label.lower() == name])
+                                      or engine.rows([]))
         
         if search_term:
-            df = df[df['Supplier Name'].str.contains(search_term, case=False, na=False) | 
-                   df['Product Searched'].str.contains(search_term, case=False, na=False)]
+            predicates['search'] = engine.rows(Filters.search_rows('suppliers', ['Supplier Name', 'Product Searched'], search_term))
         
-        return df
+        return predicates
     
     @staticmethod
     def get_filter_options():
-        """Get all available filter options"""
-        products = DataLoader.load_products()
-        suppliers = DataLoader.load_suppliers()
+        """Get all available filter options (computed once per dataset version)
+        
+        Product identifiers are not included; page through them with
+        get_product_identifiers.
+        """
+        return DataLoader.derived('filter_options', Filters._build_filter_options)
+    
+    @staticmethod
+    def get_filter_options_json():
+        """Filter options serialized once per dataset version, with an ETag of the body"""
+        def build():
+            body = json.dumps(Filters.get_filter_options(), separators=(',', ':')).encode()
+            return body, hashlib.sha1(body).hexdigest()
+        return DataLoader.derived('filter_options_json', build)
+    
+    @staticmethod
+    def _build_filter_options():
+        products = DataLoader.load_products(copy=False)
+        suppliers = DataLoader.load_suppliers(copy=False)
         
         # Handle empty dataframes
         if products.empty:
             return {
                 'categories': [],
                 'locations': sorted(suppliers['Location'].unique().tolist()) if not suppliers.empty else [],
-                'products': [],
                 'price_range': {
                     'product_min': 0,
                     'product_max': 0,
@@ -89,7 +293,6 @@ class Filters:
         return {
             'categories': sorted(products['Category'].unique().tolist()),
             'locations': sorted(suppliers['Location'].unique().tolist()) if not suppliers.empty else [],
-            'products': sorted(products['Product Identifier'].unique().tolist()),
             'price_range': {
                 'product_min': float(products['Price'].min()),
                 'product_max': float(products['Price'].max()),
@@ -102,4 +305,30 @@ class Filters:
                 'supplier_min': float(suppliers['Rating'].min()) if not suppliers.empty else 0,
                 'supplier_max': float(suppliers['Rating'].max()) if not suppliers.empty else 5
             }
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def get_product_identifiers(query=None, page=1, per_page=DEFAULT_PAGE_SIZE):
+        """One page of product identifiers, alphabetical, optionally those starting with query
+        
+        Returns (identifiers, pagination metadata). Prefixes are matched
+        case-insensitively by binary search over the sorted identifiers.
+        """
+        def build():
+            identifiers = DataLoader.load_products(copy=False)['Product Identifier'].dropna().drop_duplicates().astype(str)
+            keys = identifiers.str.lower().to_numpy(dtype=str)
+            order = np.argsort(keys, kind='stable')
+            return identifiers.to_numpy(dtype=object)[order], keys[order]
+        identifiers, keys = DataLoader.derived('product_identifiers', build)
+        
+        start, stop = 0, len(keys)
+        if query:
+            prefix = query.strip().lower()
+            start = np.searchsorted(keys, prefix, side='left')
+            stop = np.searchsorted(keys, prefix + '\uffff', side='left')
+        
+        per_page = min(max(per_page or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        page = max(page or 1, 1)
+        offset = start + (page - 1) * per_page
+        page_items = identifiers[offset:min(offset + per_page, stop)].tolist()
+        return page_items, create_pagination(int(stop - start), page, per_page)
@@ -0,0 +1,319 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+TOKEN_PATTERN = r'[a-z0-9]+'
+
+
+def tokenize(text):
+    """Lowercased alphanumeric tokens of a query string"""
+    return re.findall(TOKEN_PATTERN, str(text).lower())
+
+
+class TokenIndex:
+    """Inverted index over one text column: token -> sorted row ids
+    
+    Tokens are kept in a sorted vocabulary with their postings stored back to
+    back (CSR layout), so a token or token prefix is found by binary search
+    and its rows are a contiguous slice.
+    """
+    
+    def __init__(self, series):
+        # Tokenize each distinct value once, then expand to the rows holding it
+        codes, uniques = pd.factorize(series)
+        tokens = pd.Series(uniques, dtype=object).astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        pairs = pd.DataFrame({'value': tokens.index.to_numpy(), 'token': tokens.to_numpy(dtype=str)})
+        rows = pd.DataFrame({'value': codes, 'row': np.arange(len(codes), dtype=np.int32)})
+        postings = pairs.merge(rows, on='value')[['token', 'row']].drop_duplicates()
+        postings = postings.sort_values(['token', 'row'], kind='stable')
+        
+        vocabulary, starts = np.unique(postings['token'].to_numpy(dtype=str), return_index=True)
+        self.vocabulary = vocabulary
+        self.offsets = np.append(starts, len(postings)).astype(np.int64)
+        self.postings = postings['row'].to_numpy(dtype=np.int32)
+        self.rows = len(series)
+    
+    def lookup(self, token, prefix=False):
+        """Row ids containing token (or any token starting with it when prefix=True)"""
+        lo = np.searchsorted(self.vocabulary, token, side='left')
+        if prefix:
+            hi = np.searchsorted(self.vocabulary, token + '\uffff', side='left')
+        else:
+            hi = lo + 1 if lo < len(self.vocabulary) and self.vocabulary[lo] == token else lo
+        
+        if hi - lo == 1:
+            return self.postings[self.offsets[lo]:self.offsets[hi]]
+        return np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+    
+    def search(self, query, prefix=True):
+        """Row ids whose text contains every query token (matched as prefixes by default)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        
+        # Intersect the shortest posting lists first
+        postings = sorted((self.lookup(token, prefix=prefix) for token in set(tokens)), key=len)
+        result = postings[0]
+        for rows in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+
+def trigrams(text):
+    """Distinct trigrams of the tokens of text, joined by single spaces and padded as '  tokens '
+    
+    The trigrams spanning word boundaries make word order count, so
+    'sharma gupta' is closer to 'Sharma-Gupta' than to 'Gupta Sharma'.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return set()
+    padded = '  ' + ' '.join(tokens) + ' '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram index over one text column for similarity (fuzzy) search
+    
+    Distinct values are indexed by their trigrams (CSR layout as in
+    TokenIndex), so candidates for a query are only the values sharing at
+    least one of its trigrams and are counted from their posting lists.
+    Punctuation is ignored, so 'Sharma-Gupta' and 'Sharma Gupta' index alike.
+    """
+    
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        grams = [trigrams(value) for value in uniques]
+        pairs = pd.DataFrame({
+            'gram': [gram for value_grams in grams for gram in value_grams],
+            'value': np.repeat(np.arange(len(grams), dtype=np.int32), [len(g) for g in grams])
+        }).sort_values(['gram', 'value'], kind='stable')
+        
+        vocabulary, starts = np.unique(pairs['gram'].to_numpy(dtype=str), return_index=True)
+        self.vocabulary = vocabulary
+        self.offsets = np.append(starts, len(pairs)).astype(np.int64)
+        self.postings = pairs['value'].to_numpy(dtype=np.int32)
+        self.sizes = np.array([len(g) for g in grams], dtype=np.int32)
+        
+        # Rows of each distinct value, back to back
+        self.value_rows = np.argsort(codes, kind='stable').astype(np.int32)
+        self.value_offsets = np.searchsorted(codes[self.value_rows], np.arange(len(uniques) + 1)).astype(np.int64)
+    
+    def values(self, query, threshold=0.5, long_threshold=0.75, long_ratio=4):
+        """Distinct values similar to query, best first, as (value ids, similarity, jaccard)
+        
+        Similarity is the share of the query's trigrams found in the value, so a
+        short query can match inside a long title; ties prefer values closest in
+        length (higher trigram Jaccard). Values with more than long_ratio times
+        the query's trigrams need long_threshold instead of threshold, as long
+        titles share half the trigrams of a short query by chance.
+        """
+        empty = np.empty(0, dtype=np.int32), np.empty(0), np.empty(0)
+        grams = trigrams(query)
+        if not grams:
+            return empty
+        
+        lists = []
+        for gram in grams:
+            i = np.searchsorted(self.vocabulary, gram)
+            if i < len(self.vocabulary) and self.vocabulary[i] == gram:
+                lists.append(self.postings[self.offsets[i]:self.offsets[i + 1]])
+        if not lists:
+            return empty
+        
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.sizes))
+        candidates = np.flatnonzero(counts)
+        shared = counts[candidates]
+        similarity = shared / len(grams)
+        required = np.where(self.sizes[candidates] > long_ratio * len(grams), long_threshold, threshold)
+        keep = similarity >= required
+        candidates, shared, similarity = candidates[keep], shared[keep], similarity[keep]
+        jaccard = shared / (len(grams) + self.sizes[candidates] - shared)
+        order = np.lexsort((-jaccard, -similarity))
+        return candidates[order], similarity[order], jaccard[order]
+    
+    def search(self, query, threshold=0.5, long_threshold=0.75, long_ratio=4):
+        """Row ids whose value is similar to query, best first, with each row's similarity and jaccard"""
+        values, similarity, jaccard = self.values(query, threshold, long_threshold, long_ratio)
+        counts = self.value_offsets[values + 1] - self.value_offsets[values]
+        rows = [self.value_rows[self.value_offsets[v]:self.value_offsets[v + 1]] for v in values]
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+        return rows, np.repeat(similarity, counts), np.repeat(jaccard, counts)
+
+
+class SortedIndex:
+    """Sorted permutation of a numeric column for range lookups
+    
+    Rows are ordered by value (missing values left out, as they never pass a
+    comparison), so a range predicate is two binary searches and a slice.
+    """
+    
+    def __init__(self, series):
+        values = series.to_numpy()
+        order = np.argsort(values, kind='stable')
+        valid = order[~np.isnan(values[order])] if values.dtype.kind == 'f' else order
+        self.order = valid.astype(np.int32)
+        self.values = values[valid]
+        self.rows = len(values)
+    
+    def _bound(self, value, side):
+        # Compare in the column's dtype, as pandas does for float32 columns
+        return np.searchsorted(self.values, np.asarray(value, dtype=self.values.dtype), side=side)
+    
+    def range(self, low=None, high=None):
+        """Sorted row ids with low <= value <= high (either bound may be None)"""
+        start = 0 if low is None else self._bound(low, 'left')
+        stop = len(self.values) if high is None else self._bound(high, 'right')
+        return np.sort(self.order[start:stop])
+
+
+class RowSet:
+    """Set of row ids stored as a packed bitmap (one bit per row)"""
+    
+    def __init__(self, bits, size):
+        self.bits = bits
+        self.size = size
+    
+    @classmethod
+    def from_mask(cls, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), len(mask))
+    
+    @classmethod
+    def from_rows(cls, rows, size):
+        mask = np.zeros(size, dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return cls.from_mask(mask)
+    
+    @classmethod
+    def empty(cls, size):
+        return cls(np.zeros((size + 7) // 8, dtype=np.uint8), size)
+    
+    def __and__(self, other):
+        return RowSet(np.bitwise_and(self.bits, other.bits), self.size)
+    
+    def __or__(self, other):
+        return RowSet(np.bitwise_or(self.bits, other.bits), self.size)
+    
+    def rows(self):
+        """Sorted row ids in the set"""
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.size)).astype(np.int32)
+    
+    def __len__(self):
+        return int(np.unpackbits(self.bits, count=self.size).sum())
+
+
+class BitmapIndex:
+    """One RowSet per distinct value of a low-cardinality column (Category, Location)"""
+    
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        self.size = len(series)
+        self.labels = [str(label) for label in uniques]
+        groups = pd.Series(codes).groupby(codes).indices
+        self.bitmaps = [RowSet.from_rows(groups.get(code, []), self.size) for code in range(len(uniques))]
+        self.lookup = {}
+        for code, label in enumerate(self.labels):
+            self.lookup.setdefault(label.strip().lower(), []).append(code)
+    
+    def _union(self, codes):
+        result = RowSet.empty(self.size)
+        for code in codes:
+            result = result | self.bitmaps[code]
+        return result
+    
+    def equals(self, value):
+        """Rows whose value equals value (case-insensitive, ignoring surrounding spaces)"""
+        return self._union(self.lookup.get(str(value).strip().lower(), []))
+    
+    def contains(self, pattern):
+        """Rows whose value matches pattern like str.contains(pattern, case=False)
+        
+        The pattern is tested against every distinct value rather than every row.
+        """
+        return self._union([code for code, label in enumerate(self.labels)
+                            if re.search(pattern, label, flags=re.IGNORECASE)])
+
+
+def rank_rows(rows, scores, limit=None):
+    """Order row ids by score, highest first (ties keep row order)"""
+    if len(rows) == 0:
+        return rows
+    values = np.nan_to_num(np.asarray(scores, dtype=float)[rows], nan=-np.inf)
+    order = np.argsort(-values, kind='stable')
+    if limit is not None:
+        order = order[:limit]
+    return rows[order]
+
+
+class PrefixIndex:
+    """Typeahead completions over word-start prefixes of short texts
+    
+    Every text is indexed under each of its word suffixes ('felt bulletin
+    board', 'bulletin board', 'board'), so typing the start of any word finds
+    it. Keys live in one sorted array; any prefix is a contiguous range of it.
+    Prefixes matching more than leaf_size keys (the upper trie nodes) get their
+    top-k entries precomputed, and every other range is small enough to rank
+    on the fly, so a lookup costs the same whatever the catalog size.
+    """
+    
+    def __init__(self, entries, texts, scores, k=5, leaf_size=64, key_length=40):
+        keys, key_entries = [], []
+        for entry, text in zip(entries, texts):
+            tokens = tokenize(text)
+            for i in range(len(tokens)):
+                keys.append(' '.join(tokens[i:])[:key_length])
+                key_entries.append(entry)
+        
+        frame = pd.DataFrame({'key': keys, 'entry': np.asarray(key_entries, dtype=np.int64)})
+        frame['score'] = np.nan_to_num(np.asarray(scores, dtype=float)[frame['entry'].to_numpy()], nan=-np.inf)
+        frame = frame.drop_duplicates(['key', 'entry']).sort_values('key', kind='stable')
+        
+        self.k = k
+        self.key_length = key_length
+        self.keys = frame['key'].to_numpy(dtype=str)
+        self.entries = frame['entry'].to_numpy()
+        self.scores = frame['score'].to_numpy()
+        self.top = self._precompute(frame, k, leaf_size)
+    
+    @staticmethod
+    def _precompute(frame, k, leaf_size):
+        """Top-k entries for every prefix shared by more than leaf_size keys"""
+        candidates = frame.sort_values(['score', 'entry'], ascending=[False, True], kind='stable')
+        top = {}
+        depth = 1
+        while True:
+            candidates = candidates[candidates['key'].str.len() >= depth]
+            prefix = candidates['key'].str[:depth]
+            counts = prefix.value_counts()
+            heavy = counts.index[counts > leaf_size]
+            if len(heavy) == 0:
+                return top
+            
+            # Only keys under a heavy node can be under a heavy child
+            candidates = candidates[prefix.isin(heavy)]
+            nodes = candidates.assign(prefix=prefix).drop_duplicates(['prefix', 'entry'])
+            for node, group in nodes.groupby('prefix', sort=False).head(k).groupby('prefix', sort=False):
+                top[node] = group['entry'].to_numpy()
+            depth += 1
+    
+    def complete(self, query):
+        """Entries of the best k texts with a word starting with query"""
+        prefix = ' '.join(tokenize(query))[:self.key_length]
+        if not prefix:
+            return np.empty(0, dtype=np.int64)
+        
+        top = self.top.get(prefix)
+        if top is not None:
+            return top
+        
+        lo = np.searchsorted(self.keys, prefix, side='left')
+        hi = np.searchsorted(self.keys, prefix + '\uffff', side='left')
+        entries = self.entries[lo:hi]
+        order = np.lexsort((entries, -self.scores[lo:hi]))
+        _, first = np.unique(entries[order], return_index=True)
+        return entries[order][np.sort(first)][:self.k]
@@ -0,0 +1,129 @@
+import base64
+import json
+
+import numpy as np
+
+from app.services.data_loader import DataLoader
+from app.utils.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.helpers import create_pagination
+
+
+# Sort option -> (column, ascending); keys match PRODUCT_SORT_OPTIONS / SUPPLIER_SORT_OPTIONS
+SORT_COLUMNS = {
+    'products': {
+        'ratings': ('Ratings', False),
+        'price_low': ('Price', True),
+        'price_high': ('Price', False),
+        'reviews': ('Review', False),
+        'sales': ('Sales_Parsed', False)
+    },
+    'suppliers': {
+        'rating': ('Rating', False),
+        'price_low': ('Price', True),
+        'reviews': ('Reviews', False),
+        'location': ('Location', True)
+    }
+}
+
+
+class Pagination:
+    """Page and keyset-cursor slicing of filtered row ids in a presorted order"""
+    
+    @staticmethod
+    def sort_order(dataset, sort):
+        """Row ids in the given sort order and each row's rank in it, built once per dataset version
+        
+        Ties keep file order and missing values sort last, so the rank is a
+        total order and doubles as the keyset for cursors.
+        """
+        def build():
+            df = DataLoader.load_products(copy=False) if dataset == 'products' else DataLoader.load_suppliers(copy=False)
+            column, ascending = SORT_COLUMNS[dataset][sort]
+            order = df[column].sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            return order, rank
+        return DataLoader.derived(('sort_order', dataset, sort), build)
+    
+    @staticmethod
+    def _smallest(rows, keys, k):
+        """The k rows with the smallest keys, in key order (partial sort)"""
+        if k < len(rows):
+            part = np.argpartition(keys, k - 1)[:k]
+            rows, keys = rows[part], keys[part]
+        order = np.argsort(keys, kind='stable')
+        return rows[order], keys[order]
+    
+    @staticmethod
+    def encode_cursor(dataset, sort, key):
+        """Opaque cursor for the row with the given key, stamped with the dataset's version"""
+        data = json.dumps([DataLoader.get_dataset_version(dataset), sort, int(key)])
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(dataset, cursor, sort):
+        """Key of the row a cursor points to; ValueError when it is malformed, for another sort or stale"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            version, cursor_sort, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(version, int) or not (cursor_sort is None or isinstance(cursor_sort, str)):
+                raise TypeError
+            key = int(key)
+            if key < 0:
+                raise ValueError
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError('Invalid cursor')
+        if cursor_sort != sort:
+            raise ValueError('Cursor was issued for a different sort order')
+        if version != DataLoader.get_dataset_version(dataset):
+            raise ValueError('Cursor has expired because the data was reloaded; request the first page again')
+        return key
+    
+    @staticmethod
+    def paginate(dataset, rows, size, sort=None, page=1, per_page=None, cursor=None):
+        """Pick one page of row ids
+        
+        rows are the filtered row ids (None for all size rows). With a cursor
+        the page starts right after the row the cursor points to; otherwise at
+        page. Returns (page row ids, pagination metadata). Raises ValueError
+        for an unknown sort or a bad cursor.
+        """
+        if sort and sort not in SORT_COLUMNS[dataset]:
+            raise ValueError(f"Unknown sort '{sort}'; use one of {', '.join(SORT_COLUMNS[dataset])}")
+        
+        sort = sort or None
+        per_page = min(max(per_page or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        page = max(page or 1, 1)
+        after = Pagination.decode_cursor(dataset, cursor, sort) if cursor else None
+        offset = 0 if cursor else (page - 1) * per_page
+        
+        if rows is None:
+            # Unfiltered: the presorted order (or file order) is sliced directly;
+            # the key of the row at position p is p
+            total = size
+            start = after + 1 if cursor else offset
+            stop = min(start + per_page, size)
+            page_rows = Pagination.sort_order(dataset, sort)[0][start:stop] if sort else np.arange(start, stop)
+            last_key = stop - 1
+            has_more = stop < size
+        else:
+            # Filtered: keys are ranks in the presorted order (row ids for file order);
+            # only the rows up to the end of the page are sorted
+            rows = np.asarray(rows)
+            total = len(rows)
+            keys = Pagination.sort_order(dataset, sort)[1][rows] if sort else rows
+            if cursor:
+                later = keys > after
+                rows, keys = rows[later], keys[later]
+            top, top_keys = Pagination._smallest(rows, keys, offset + per_page)
+            page_rows = top[offset:]
+            last_key = top_keys[-1] if len(top_keys) else None
+            has_more = len(rows) > offset + per_page
+        
+        if cursor:
+            pagination = {'per_page': per_page, 'total_items': total}
+        else:
+            pagination = create_pagination(total, page, per_page)
+        pagination['sort'] = sort
+        pagination['next_cursor'] = Pagination.encode_cursor(dataset, sort, last_key) if has_more and len(page_rows) else None
+        return page_rows, pagination
@@ -0,0 +1,74 @@
+"""Vectorized parsers for the scraped product fields
+
+Scraped columns repeat a small set of strings ("2K+ bought in past month",
+"4.1", "1,299"), so each parser factorizes the column once and runs the
+string work on the distinct values only, then maps the results back with
+the codes. The output matches parsing every row.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Number with an optional K/M suffix, e.g. "1.2K", "500", "700+ BOUGHT IN PAST MONTH"
+SALES_PATTERN = r'(\d+\.?\d*)\s*([KM])?'
+SALES_MULTIPLIERS = {'K': 1000, 'M': 1000000}
+
+
+def _map_unique(series, parse, missing):
+    """Run parse on the distinct values of series and broadcast the result to every row"""
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return np.full(len(series), missing)
+    parsed = np.asarray(parse(pd.Series(uniques)))
+    # Code -1 (missing) picks the value appended at the end
+    return np.append(parsed, np.asarray(missing, dtype=parsed.dtype))[codes]
+
+
+def parse_price(series):
+    """Price text like '₹1,299' -> float (missing stays NaN)"""
+    def parse(values):
+        return values.astype(str).str.replace(',', '').str.replace('₹', '').str.strip().astype(float)
+    return pd.Series(_map_unique(series, parse, np.nan), index=series.index)
+
+
+def parse_rating(series):
+    """First decimal number in the text -> float (0 when there is none)"""
+    def parse(values):
+        return values.astype(str).str.extract(r'(\d+\.?\d*)')[0].fillna(0).astype(float)
+    return pd.Series(_map_unique(series, parse, 0.0), index=series.index)
+
+
+def parse_count(series):
+    """First integer in the text, thousands separators removed -> int (0 when there is none)"""
+    def parse(values):
+        return values.astype(str).str.replace(',', '').str.extract(r'(\d+)')[0].fillna(0).astype(int)
+    return pd.Series(_map_unique(series, parse, 0), index=series.index)
+
+
+def parse_sales(series):
+    """Monthly sales text -> (leading integer, value with K/M applied)
+    
+    '2K+ bought in past month' gives 2 and 2000.0; missing values give 0 and 0.0.
+    """
+    def parse_number(values):
+        return values.astype(str).str.extract(r'(\d+)')[0].fillna(0).astype(int)
+    
+    def parse_value(values):
+        parts = values.astype(str).str.strip().str.upper().str.extract(SALES_PATTERN)
+        number = parts[0].astype(float).fillna(0)
+        return number * parts[1].map(SALES_MULTIPLIERS).fillna(1)
+    
+    series = series.fillna('0').astype(str)
+    number = pd.Series(_map_unique(series, parse_number, 0), index=series.index)
+    value = pd.Series(_map_unique(series, parse_value, 0.0), index=series.index)
+    return number, value
+
+
+def parse_sales_value(text):
+    """Scalar version of parse_sales for a single value; None when no number is found"""
+    match = re.search(SALES_PATTERN, str(text).strip().upper())
+    if not match:
+        return None
+    return float(match.group(1)) * SALES_MULTIPLIERS.get(match.group(2), 1)
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+DEFAULT_COMPRESSION = 200
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch (a merging t-digest)
+    
+    Values are summarized as weighted centroids, small near both tails and
+    larger in the middle (the k1 scale function), so extreme quantiles such as
+    p99 stay accurate with about compression / 2 centroids however many values
+    were added. Two sketches merge by pooling their centroids and compressing
+    again, which lets per-file sketches be combined without the raw values.
+    """
+    
+    def __init__(self, means=None, weights=None, minimum=np.inf, maximum=-np.inf, compression=DEFAULT_COMPRESSION):
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.minimum = minimum
+        self.maximum = maximum
+        self.compression = compression
+    
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        """Sketch of the non-missing values of an array"""
+        values = np.asarray(values, dtype=float)
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            return cls(compression=compression)
+        sketch = cls(values, np.ones(len(values)), values[0], values[-1], compression)
+        sketch._compress()
+        return sketch
+    
+    @property
+    def count(self):
+        return int(self.weights.sum())
+    
+    def merge(self, other):
+        """A new sketch summarizing the values of both"""
+        merged = QuantileSketch(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+            min(self.minimum, other.minimum),
+            max(self.maximum, other.maximum),
+            max(self.compression, other.compression)
+        )
+        merged._compress()
+        return merged
+    
+    def _compress(self):
+        """Pool neighbouring centroids that fall in the same unit of the k1 scale"""
+        if len(self.means) == 0:
+            return
+        order = np.argsort(self.means, kind='stable')
+        means, weights = self.means[order], self.weights[order]
+        
+        # k1(q) = compression / (2 pi) * asin(2q - 1), evaluated at each centroid's middle
+        total = weights.sum()
+        middle = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * middle - 1)
+        clusters = np.floor(k - k[0]).astype(np.int64)
+        _, clusters = np.unique(clusters, return_inverse=True)
+        
+        pooled = np.bincount(clusters, weights=weights)
+        self.means = np.bincount(clusters, weights=means * weights) / pooled
+        self.weights = pooled
+    
+    def quantile(self, q):
+        """Estimated value at quantile q (0..1, or an array of them); NaN when empty"""
+        q = np.asarray(q, dtype=float)
+        if len(self.means) == 0:
+            return np.full(q.shape, np.nan)
+        # Rank of each centroid's middle value; with single-value centroids this
+        # is exact and matches np.quantile's default linear interpolation
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2 - 0.5
+        positions = np.concatenate([[0], centers, [total - 1]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return np.interp(q * (total - 1), positions, values)
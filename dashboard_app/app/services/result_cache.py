@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Size-bounded LRU cache tied to a dataset version
+    
+    Entries are only valid for the version they were computed against: the
+    first lookup with a newer version drops everything, so a data reload
+    invalidates the cache without any explicit call.
+    """
+    
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+    
+    def _sync(self, version):
+        """Move to a newer version; False if version is older than the cache's"""
+        if self.version is None or version > self.version:
+            self.entries.clear()
+            self.version = version
+        return version == self.version
+    
+    def get(self, key, version):
+        """Cached value for key, or None on a miss"""
+        with self.lock:
+            if self._sync(version) and key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, version, value):
+        with self.lock:
+            # A result computed before a reload must not land in the new version
+            if not self._sync(version) or self.maxsize <= 0:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
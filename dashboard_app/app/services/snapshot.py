@@ -0,0 +1,162 @@
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+class SnapshotStore:
+    """Columnar on-disk snapshots of cleaned DataFrames (one .npy file per column)"""
+    
+    FORMAT_VERSION = 1
+    MANIFEST = 'manifest.json'
+    
+    def __init__(self, directory, mmap=False):
+        self.directory = directory
+        # Memory-map numeric columns and categorical codes read-only, so every
+        # process loading the same snapshot shares them through the page cache
+        self.mmap = mmap
+    
+    @staticmethod
+    def fingerprint(paths, schema=0):
+        """Fingerprint source files by name, size and modification time
+        
+        schema identifies the cleaning code that produced the frame, so a
+        change to it invalidates old snapshots even if the CSVs did not change.
+        """
+        result = []
+        for path in sorted(paths):
+            result.append([os.path.basename(path)] + SnapshotStore.file_fingerprint(path))
+        return {
+            'format': SnapshotStore.FORMAT_VERSION,
+            'schema': schema,
+            'pandas': pd.__version__,
+            'sources': result
+        }
+    
+    @staticmethod
+    def file_fingerprint(path):
+        """Size and modification time of a single source file"""
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def _path(self, name, *parts):
+        return os.path.join(self.directory, name, *parts)
+    
+    def read_manifest(self, name):
+        """Return the manifest of a snapshot, or None if there is none"""
+        try:
+            with open(self._path(name, self.MANIFEST), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def load(self, name, fingerprint):
+        """Load a snapshot written for the given source fingerprint
+        
+        Returns (frame, manifest), or (None, None) if the snapshot is missing or stale.
+        """
+        manifest = self.read_manifest(name)
+        if manifest is None or manifest.get('fingerprint') != fingerprint:
+            return None, None
+        
+        try:
+            columns = {}
+            for column in manifest['columns']:
+                columns[column['name']] = self._read_column(name, column)
+        except (OSError, ValueError, KeyError):
+            return None, None
+        
+        df = pd.DataFrame(columns, copy=False)
+        if len(df.columns) == 0:
+            df = pd.DataFrame(index=pd.RangeIndex(manifest['rows']))
+        return df, manifest
+    
+    def save(self, name, df, fingerprint, extra=None):
+        """Write a snapshot of df; returns False if the frame cannot be stored"""
+        os.makedirs(self._path(name), exist_ok=True)
+        token = uuid.uuid4().hex[:8]
+        previous = self.read_manifest(name)
+        
+        columns = []
+        for position, column_name in enumerate(df.columns):
+            spec = self._write_column(name, f'{position}-{token}', df[column_name])
+            if spec is None:
+                return False
+            spec['name'] = column_name
+            columns.append(spec)
+        
+        manifest = {
+            'fingerprint': fingerprint,
+            'rows': len(df),
+            'columns': columns
+        }
+        if extra:
+            manifest.update(extra)
+        
+        tmp_path = self._path(name, f'{self.MANIFEST}.{token}')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._path(name, self.MANIFEST))
+        
+        # Remove files of the snapshot we just replaced
+        if previous:
+            for column in previous.get('columns', []):
+                for filename in column.get('files', []):
+                    try:
+                        os.remove(self._path(name, filename))
+                    except OSError:
+                        pass
+        return True
+    
+    def _write_column(self, name, stem, series):
+        """Write one column; strings and categoricals are stored as codes plus labels"""
+        dtype = series.dtype
+        
+        if isinstance(dtype, pd.CategoricalDtype):
+            labels = np.asarray(dtype.categories)
+            if labels.dtype == object:
+                labels = labels.astype(str)
+            codes = series.cat.codes.to_numpy()
+            kind = 'category'
+        elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            values = series.to_numpy()
+            if values.dtype == object:
+                return None
+            filename = f'{stem}.npy'
+            np.save(self._path(name, filename), values, allow_pickle=False)
+            return {'kind': 'numeric', 'files': [filename]}
+        else:
+            if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+                return None
+            codes, uniques = pd.factorize(series)
+            labels = np.asarray(uniques, dtype=object).astype(str)
+            kind = 'string'
+        
+        code_file = f'{stem}.codes.npy'
+        label_file = f'{stem}.labels.npy'
+        np.save(self._path(name, code_file), codes, allow_pickle=False)
+        np.save(self._path(name, label_file), labels, allow_pickle=False)
+        return {'kind': kind, 'dtype': str(dtype), 'files': [code_file, label_file]}
+    
+    def _read_column(self, name, column):
+        files = [self._path(name, filename) for filename in column['files']]
+        
+        mmap_mode = 'r' if self.mmap else None
+        
+        if column['kind'] == 'numeric':
+            return np.load(files[0], mmap_mode=mmap_mode, allow_pickle=False)
+        
+        codes = np.load(files[0], mmap_mode=mmap_mode, allow_pickle=False)
+        labels = np.load(files[1], allow_pickle=False)
+        
+        if column['kind'] == 'category':
+            if labels.dtype.kind == 'U':
+                labels = labels.astype(object)
+            # Codes were written from a valid categorical; skipping validation keeps them mapped
+            return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(labels), validate=False)
+        
+        values = labels.astype(object)[codes] if len(labels) else np.empty(len(codes), dtype=object)
+        values[codes == -1] = np.nan
+        return pd.Series(values, dtype=column['dtype'])
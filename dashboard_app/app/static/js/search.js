@@ -1,6 +1,6 @@
 /**
  * Global Search System
- * Handles live search with autocomplete
+ * Handles live search with autocomplete (served by /api/typeahead)
  */
 
 class GlobalSearch {
@@ -24,9 +24,10 @@ class GlobalSearch {
                 return;
             }
             
+            // Typeahead answers from precomputed completions, so a short debounce is enough
             this.debounceTimer = setTimeout(() => {
                 this.performSearch(query);
-            }, 300);
+            }, 100);
         });
         
         // Keyboard shortcuts
@@ -54,8 +55,10 @@ class GlobalSearch {
     
     async performSearch(query) {
         try {
-            const response = await fetch(`/api/search?q=${encodeURIComponent(query)}`);
+            const response = await fetch(`/api/typeahead?q=${encodeURIComponent(query)}`);
             const data = await response.json();
+            // Ignore responses that arrive after the user kept typing
+            if (query !== this.searchInput.value.trim()) return;
             this.displayResults(data);
         } catch (error) {
             console.error('Search error:', error);
@@ -85,8 +88,8 @@ class GlobalSearch {
                         <div class="search-result-content">
                             <div class="search-result-title">${this.highlightQuery(product.Title, this.searchInput.value)}</div>
                             <div class="search-result-meta">
-                                <span class="badge bg-success">₹${Math.round(product.Price)}</span>
-                                <span class="badge bg-warning text-dark">${product.Ratings.toFixed(1)} ⭐</span>
+                                <span class="badge bg-success">₹${Math.round(product.Price || 0)}</span>
+                                <span class="badge bg-warning text-dark">${(product.Ratings || 0).toFixed(1)} ⭐</span>
                             </div>
                         </div>
                     </a>
@@ -106,7 +109,7 @@ class GlobalSearch {
                             <div class="search-result-title">${this.highlightQuery(supplier['Supplier Name'], this.searchInput.value)}</div>
                             <div class="search-result-meta">
                                 <span><i class="bi bi-geo-alt"></i> ${supplier.Location}</span>
-                                <span class="badge bg-warning text-dark">${supplier.Rating.toFixed(1)} ⭐</span>
+                                <span class="badge bg-warning text-dark">${(supplier.Rating || 0).toFixed(1)} ⭐</span>
                             </div>
                         </div>
                     </a>
@@ -33,6 +33,12 @@ PRICE_RANGES = {
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
 
+# Longest top-products/top-suppliers list served from the precomputed rankings
+TOP_K_CAP = 100
+
+# Most bins /api/price-distribution will compute
+MAX_HISTOGRAM_BINS = 100
+
 # Cache timeouts (seconds)
 CACHE_SHORT = 300      # 5 minutes
 CACHE_MEDIUM = 1800    # 30 minutes
@@ -62,6 +68,32 @@ SUPPLIER_SORT_OPTIONS = [
     ('location', 'Location')
 ]
 
+# Column presets for the fields= parameter of the JSON API
+FIELD_PRESETS = {
+    'products': {
+        'card': ['Product Identifier', 'Title', 'Image', 'Price', 'Ratings', 'Review'],
+        'table': ['Product Identifier', 'Title', 'Category', 'Price', 'Ratings', 'Review', 'Monthly Sales']
+    },
+    'suppliers': {
+        'card': ['Supplier Name', 'Location', 'Price', 'Rating', 'Reviews'],
+        'table': ['Supplier Round', 'Supplier Name', 'Product Searched', 'Location', 'Price',
+                  'Rating', 'Reviews', 'Contact Phone', 'IndiaMART Link']
+    },
+    'ai_products': {
+        'card': ['Product Identifier', 'Title', 'Image', 'Price', 'Ratings',
+                 'AI_Total_Score', 'AI_Potential', 'AI_Potential_Color'],
+        'table': ['Product Identifier', 'Title', 'Image', 'Price', 'Ratings', 'Review',
+                  'AI_Total_Score', 'AI_Potential', 'AI_Potential_Color',
+                  'AI_Price_Score', 'AI_Rating_Score', 'AI_Sales_Score', 'Category']
+    }
+}
+
+# Fuzzy search: minimum share of the query's trigrams a match must contain,
+# raised for values with more than FUZZY_LONG_VALUE_RATIO times the query's trigrams
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_LONG_MIN_SIMILARITY = 0.75
+FUZZY_LONG_VALUE_RATIO = 4
+
 # Export formats
 EXPORT_FORMATS = ['csv', 'excel', 'json']
 
@@ -192,4 +192,24 @@ def create_pagination(total_items, page=1, per_page=20):
         'has_next': page < total_pages,
         'prev_page': page - 1 if page > 1 else None,
         'next_page': page + 1 if page < total_pages else None
-    }
\ No newline at end of file
+    }
+
+def resolve_fields(fields, columns, presets=None):
+    """Columns named by a fields= parameter: a preset name or a comma-separated list
+    
+    Returns None when no fields were requested; raises ValueError for unknown names.
+    """
+    if not fields:
+        return None
+    
+    presets = presets or {}
+    selected = []
+    for name in (part.strip() for part in fields.split(',')):
+        for column in presets.get(name, [name]):
+            if column and column not in selected:
+                selected.append(column)
+    
+    unknown = [column for column in selected if column not in columns]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return selected
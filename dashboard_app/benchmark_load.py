@@ -0,0 +1,119 @@
+"""
+Benchmark product cleaning: the old per-pass string cleaning plus row-by-row
+sales parsing against clean_products, which the loader runs on every file.
+
+Builds a synthetic dataset by repeating the processed category CSVs (with
+prices, reviews and sales jittered so values don't all repeat) and reports
+rows/sec for both paths.
+
+Usage: python benchmark_load.py [--scale 50] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_loader import clean_products
+
+
+def legacy_parse_sales(value):
+    """Row-by-row sales parsing as get_best_sellers used to do it"""
+    if pd.isna(value) or value is None:
+        return 0
+    value = str(value).strip().upper()
+    try:
+        if 'K' in value:
+            return float(value.replace('K', '').replace(',', '')) * 1000
+        elif 'M' in value:
+            return float(value.replace('M', '').replace(',', '')) * 1000000
+        match = re.search(r'\d+', value)
+        return float(match.group()) if match else 0
+    except (ValueError, AttributeError):
+        return 0
+
+
+def legacy_clean(df):
+    """Product cleaning as load_products did it before the vectorized parsers"""
+    df.columns = df.columns.str.strip()
+    title_col = next((c for c in df.columns if c.lower().strip() == 'title'), 'Title')
+    image_col = next((c for c in df.columns if c.lower().strip() == 'image'), 'Image')
+    df['Title'] = df[title_col].fillna('').astype(str).str.strip()
+    df['Title'] = df['Title'].replace('', 'Unknown Product')
+    df['Image'] = df[image_col].fillna('').astype(str)
+    
+    df['Price'] = df['Price'].astype(str).str.replace(',', '').str.replace('₹', '').str.strip().astype(float)
+    df['Ratings'] = df['Ratings'].astype(str).str.extract(r'(\d+\.?\d*)').fillna(0).astype(float)
+    df['Review'] = df['Review'].astype(str).str.replace(',', '').str.extract(r'(\d+)').fillna(0).astype(int)
+    df['Monthly Sales'] = df['Monthly Sales'].fillna('0').astype(str)
+    df['Sales_Number'] = df['Monthly Sales'].str.extract(r'(\d+)').fillna(0).astype(int)
+    # Sales were then re-parsed per request by get_best_sellers and analyze_all_products
+    df['Sales_Parsed'] = df['Monthly Sales'].apply(legacy_parse_sales)
+    
+    if 'Product Identified' in df.columns and 'Product Identifier' not in df.columns:
+        df['Product Identifier'] = df['Product Identified'].fillna('Unknown').astype(str)
+    elif 'Product Identifier' in df.columns:
+        df['Product Identifier'] = df['Product Identifier'].fillna('Unknown').astype(str)
+    else:
+        df['Product Identifier'] = df['Title'].str[:50]
+    return df
+
+
+def build_dataset(scale, seed=42):
+    """Repeat the category CSVs scale times, jittering the numeric text fields"""
+    files = glob.glob(os.path.join('data', 'processed', '*.csv'))
+    frames = []
+    for path in files:
+        df = pd.read_csv(path, encoding='utf-8-sig')
+        df.columns = df.columns.str.strip()
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    base = pd.concat(frames, ignore_index=True)
+    
+    rng = np.random.default_rng(seed)
+    rows = len(base) * scale
+    base = base.iloc[np.resize(np.arange(len(base)), rows)].reset_index(drop=True)
+    
+    prices = rng.integers(50, 50000, rows)
+    base['Price'] = ['{:,}'.format(p) for p in prices]
+    base['Review'] = ['{:,}'.format(r) for r in rng.integers(0, 100000, rows)]
+    units = rng.choice(['', 'K'], rows, p=[0.7, 0.3])
+    base['Monthly Sales'] = [f'{n}{u}+ bought in past month' for n, u in zip(rng.integers(1, 1000, rows), units)]
+    return base
+
+
+def run(name, func, data, repeat):
+    best = None
+    for _ in range(repeat):
+        df = data.copy()
+        started = time.perf_counter()
+        func(df)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<8} {len(data):>10,} rows  {best:8.3f} s  {len(data) / best:>12,.0f} rows/sec")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=50, help='times to repeat the bundled products')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per path (best is reported)')
+    args = parser.parse_args()
+    
+    data = build_dataset(args.scale)
+    if data.empty:
+        print("No product CSVs found in data/processed")
+        return
+    
+    old = run('old', legacy_clean, data, args.repeat)
+    new = run('new', clean_products, data, args.repeat)
+    print(f"speedup  {old / new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
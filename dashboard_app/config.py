@@ -9,6 +9,22 @@ class Config:
     SUPPLIER_CSV = os.path.join(DATA_DIR, 'supplier_results.csv')
     PROCESSED_DIR = os.path.join(DATA_DIR, 'processed')
     
+    # Columnar snapshots of the cleaned data (rebuilt when the CSVs change)
+    SNAPSHOT_DIR = os.path.join(DATA_DIR, 'snapshots')
+    USE_DATA_SNAPSHOT = os.environ.get('USE_DATA_SNAPSHOT', '1') != '0'
+    
+    # Memory-map snapshot columns so gunicorn workers share one copy of the data
+    DATA_SNAPSHOT_MMAP = os.environ.get('DATA_SNAPSHOT_MMAP', '1') != '0'
+    
+    # Load the dataset inside create_app (with gunicorn --preload: once, in the master)
+    PRELOAD_DATA = os.environ.get('PRELOAD_DATA', '0') == '1'
+    
+    # Processes used to parse category CSVs in parallel (0 or 1 = serial)
+    DATA_LOAD_WORKERS = int(os.environ.get('DATA_LOAD_WORKERS', 0))
+    
+    # Rows per chunk when streaming the supplier CSV (0 = read it in one go)
+    SUPPLIER_CHUNK_SIZE = int(os.environ.get('SUPPLIER_CHUNK_SIZE', 0))
+    
     # Database settings
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(BASE_DIR, 'dashboard.db')
@@ -17,6 +33,9 @@ class Config:
     # Cache settings
     CACHE_TIMEOUT = 300  # 5 minutes
     
+    # Filter combinations whose matching row ids are kept (LRU, reset on data reload)
+    FILTER_CACHE_SIZE = int(os.environ.get('FILTER_CACHE_SIZE', 256))
+    
     # Pagination
     ITEMS_PER_PAGE = 20
     
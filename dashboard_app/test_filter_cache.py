@@ -0,0 +1,45 @@
+"""Regression tests for the filter result cache"""
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import create_app
+from app.services.data_loader import DataLoader
+from app.services.filters import Filters
+
+
+def _client():
+    app = create_app()
+    app.config['LOGIN_DISABLED'] = True
+    with app.app_context():
+        DataLoader.clear_cache()
+    Filters._results = None
+    return app.test_client()
+
+
+def test_padded_category_shares_rows_with_clean_value():
+    """A padded value sent first must not cache an empty result for the clean one"""
+    client = _client()
+    padded = client.get('/api/products?category=Office Supplies ').get_json()
+    clean = client.get('/api/products?category=Office Supplies').get_json()
+    
+    assert clean['pagination']['total_items'] > 0
+    assert padded['pagination']['total_items'] == clean['pagination']['total_items']
+    
+    charts = client.get('/api/charts/products?category=Office Supplies').get_json()
+    assert charts['count'] == clean['pagination']['total_items']
+
+
+def test_padded_location_shares_rows_with_clean_value():
+    client = _client()
+    padded = client.get('/api/suppliers?location= kota').get_json()
+    clean = client.get('/api/suppliers?location=Kota').get_json()
+    
+    assert clean['pagination']['total_items'] > 0
+    assert padded['pagination']['total_items'] == clean['pagination']['total_items']
+
+
+if __name__ == '__main__':
+    test_padded_category_shares_rows_with_clean_value()
+    test_padded_location_shares_rows_with_clean_value()
+    print("✓ Filter cache tests passed")
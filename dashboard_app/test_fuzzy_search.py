@@ -0,0 +1,37 @@
+"""Regression tests for fuzzy (trigram) search ranking"""
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import create_app
+
+
+def _client():
+    app = create_app()
+    app.config['LOGIN_DISABLED'] = True
+    return app.test_client()
+
+
+def _fuzzy(client, query):
+    return client.get('/api/search', query_string={'q': query, 'mode': 'fuzzy'}).get_json()
+
+
+def test_closest_spelling_variant_ranks_first():
+    """Names containing every query trigram are ordered by closeness, not by reviews"""
+    client = _client()
+    names = [supplier['Supplier Name'] for supplier in _fuzzy(client, 'sharma gupta')['suppliers']]
+    assert names[0] == 'Sharma-Gupta Industries'
+    
+    names = [supplier['Supplier Name'] for supplier in _fuzzy(client, 'sharma gupta industrees')['suppliers']]
+    assert names[0] == 'Sharma-Gupta Industries'
+
+
+def test_short_query_does_not_match_unrelated_long_titles():
+    client = _client()
+    assert _fuzzy(client, 'sharma')['products'] == []
+
+
+if __name__ == '__main__':
+    test_closest_spelling_variant_ranks_first()
+    test_short_query_does_not_match_unrelated_long_titles()
+    print("✓ Fuzzy search tests passed")